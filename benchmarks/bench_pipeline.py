@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Time each stage of the jtbl pipeline on synthetic data and compare with a baseline.
+
+    python3 benchmarks/bench_pipeline.py [--rows=1000,10000] [--datasets=narrow,wide]
+                                         [--repeat=3] [--tolerance=1.5]
+                                         [--baseline=FILE] [--save]
+
+Each stage is timed separately (best of --repeat runs) and its peak memory is
+recorded with tracemalloc. Results are compared with the baseline file (default
+benchmarks/baseline.json) and the script exits with an error if a stage is slower
+than --tolerance times its baseline, or uses more than --tolerance times the memory.
+--save writes the results as the new baseline instead.
+
+Timings depend on the machine, so save a baseline on the machine that runs the
+comparison.
+"""
+import os
+import gc
+import sys
+import json
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jtbl.cli
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+ROWS = [1000, 10000]
+COLUMNS = 80
+REPEAT = 3
+TOLERANCE = 1.5
+MIN_SECONDS = 0.005     # differences below this are noise
+MIN_PEAK_KB = 64
+WORDS = ['alpha', 'beta', 'gamma', 'delta', 'epsilon', 'zeta', 'eta', 'theta']
+UNICODE_WORDS = ['日本語', 'données', 'Ελληνικά', '한국어', 'emoji😀', 'naïve', 'Straße', '中文字符']
+
+
+def narrow(rng, i):
+    return {'id': i, 'name': rng.choice(WORDS), 'value': round(rng.random() * 1000, 3), 'ok': rng.random() > 0.5}
+
+
+def wide(rng, i):
+    row = {}
+    for c in range(40):
+        row[f'column{c}'] = rng.randint(0, 10 ** (c % 8)) if c % 2 else rng.choice(WORDS)
+    return row
+
+
+def long_strings(rng, i):
+    return {
+        'id': i,
+        'message': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 200))),
+        'path': '/'.join(rng.choice(WORDS) for _ in range(rng.randint(5, 30)))
+    }
+
+
+def nested(rng, i):
+    return {
+        'id': i,
+        'tags': [rng.choice(WORDS) for _ in range(rng.randint(0, 5))],
+        'meta': {'owner': rng.choice(WORDS), 'limits': {'cpu': rng.randint(1, 64), 'mem': rng.random()}},
+        'parent': None if rng.random() > 0.5 else {'id': rng.randint(0, i + 1)}
+    }
+
+
+def unicode_text(rng, i):
+    return {
+        'id': i,
+        'name': rng.choice(UNICODE_WORDS),
+        'description': ' '.join(rng.choice(UNICODE_WORDS) for _ in range(rng.randint(1, 8)))
+    }
+
+
+DATASETS = {
+    'narrow': narrow,
+    'wide': wide,
+    'long': long_strings,
+    'nested': nested,
+    'unicode': unicode_text
+}
+
+
+def make_data(dataset, rows):
+    rng = random.Random(rows)
+    return [DATASETS[dataset](rng, i) for i in range(rows)]
+
+
+def stages(text_json, text_jsonl):
+    """return a list of (name, function) for each pipeline stage"""
+    data = jtbl.cli.get_json(text_json, columns=COLUMNS)[1]
+    backends = [
+        (f'get_json[jsonl:{backend}]', lambda backend=backend: jtbl.cli.get_json(text_jsonl, columns=COLUMNS, backend=backend))
+        for backend in jtbl.cli.JSON_BACKENDS if jtbl.cli.get_json_backend(backend)[0]
+    ]
+    return [
+        ('get_json[json]', lambda: jtbl.cli.get_json(text_json, columns=COLUMNS)),
+        ('get_json[jsonl]', lambda: jtbl.cli.get_json(text_jsonl, columns=COLUMNS)),
+    ] + backends + [
+        ('check_data', lambda: jtbl.cli.check_data(data, columns=COLUMNS)),
+        ('get_headers', lambda: jtbl.cli.get_headers(data)),
+        ('wrap', lambda: jtbl.cli.wrap(data, columns=COLUMNS, table_format='simple', truncate=False)),
+        ('make_table', lambda: jtbl.cli.make_table(data=data, columns=COLUMNS)),
+        ('make_rotate_table', lambda: jtbl.cli.make_rotate_table(data=data, columns=COLUMNS, rotate=True)),
+        ('make_csv_table', lambda: jtbl.cli.make_csv_table(data=data))
+    ]
+
+
+def measure(func, repeat):
+    """return the best time in seconds and the peak memory in KiB of func()"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak // 1024
+
+
+def compare(results, baseline, tolerance):
+    """print the results next to the baseline and return the regressions"""
+    regressions = []
+    print(f'{"benchmark":<42}{"seconds":>10}{"baseline":>10}{"peak KiB":>10}{"baseline":>10}')
+    for key, result in results.items():
+        base = baseline.get(key, {})
+        base_seconds = base.get('seconds')
+        base_peak = base.get('peak_kb')
+        flag = ''
+        if base_seconds is not None and result['seconds'] > max(base_seconds * tolerance, base_seconds + MIN_SECONDS):
+            flag += ' slower'
+        if base_peak is not None and result['peak_kb'] > max(base_peak * tolerance, base_peak + MIN_PEAK_KB):
+            flag += ' memory'
+        if flag:
+            regressions.append(key)
+
+        print(
+            f'{key:<42}{result["seconds"]:>10.4f}'
+            f'{"" if base_seconds is None else f"{base_seconds:.4f}":>10}'
+            f'{result["peak_kb"]:>10}{"" if base_peak is None else base_peak:>10}{flag}'
+        )
+
+    return regressions
+
+
+def main():
+    options = dict((arg[2:].split('=', 1) + [None])[:2] for arg in sys.argv[1:] if arg.startswith('--'))
+    rows_list = [int(rows) for rows in options['rows'].split(',')] if options.get('rows') else ROWS
+    datasets = options['datasets'].split(',') if options.get('datasets') else list(DATASETS)
+    repeat = int(options.get('repeat') or REPEAT)
+    tolerance = float(options.get('tolerance') or TOLERANCE)
+    baseline_file = options.get('baseline') or BASELINE
+
+    results = {}
+    for dataset in datasets:
+        for rows in rows_list:
+            data = make_data(dataset, rows)
+            text_json = json.dumps(data)
+            text_jsonl = '\n'.join(map(json.dumps, data))
+            del data
+
+            for name, func in stages(text_json, text_jsonl):
+                seconds, peak_kb = measure(func, repeat)
+                results[f'{dataset}/{rows}/{name}'] = {'seconds': round(seconds, 6), 'peak_kb': peak_kb}
+
+    if 'save' in options:
+        with open(baseline_file, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        compare(results, {}, tolerance)
+        print(f'saved baseline to {baseline_file}')
+        return
+
+    baseline = {}
+    if os.path.exists(baseline_file):
+        with open(baseline_file) as f:
+            baseline = json.load(f)
+
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        print(f'{len(regressions)} regression(s) against {baseline_file}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Compare the built-in table renderer with tabulate.
+
+    python3 benchmarks/bench_render.py [ROWS]
+
+Each table is rendered by both and the output is checked to be identical.
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import jtbl.cli
+
+
+def make_rows(rows, columns):
+    rng = random.Random(0)
+    data = []
+    for i in range(rows):
+        row = {}
+        for c in range(columns):
+            kind = c % 4
+            if kind == 0:
+                row[f'id{c}'] = i * c
+            elif kind == 1:
+                row[f'ratio{c}'] = round(rng.random() * 1000, rng.randint(0, 4))
+            elif kind == 2:
+                row[f'name{c}'] = ''.join(rng.choice('abcdefghij ') for _ in range(rng.randint(3, 20)))
+            else:
+                row[f'flag{c}'] = rng.choice([True, False, None])
+        data.append(row)
+
+    return jtbl.cli.Table.from_dicts(data)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    tabulate = jtbl.cli.get_tabulate()
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print(f'{"table":<16}{"format":<12}{"tabulate":>10}{"built-in":>10}{"speedup":>9}')
+    for name, columns in (('narrow (5 col)', 5), ('wide (30 col)', 30)):
+        table = make_rows(rows, columns)
+        for table_format in ('simple', 'fancy_grid', 'github', 'dokuwiki'):
+            tabulate_time, expected = timed(
+                tabulate.tabulate, table.rows, headers=table.headers, tablefmt=table_format, floatfmt=''
+            )
+            native_time, result = timed(jtbl.cli.render_table, table, table_format)
+
+            if result != expected:
+                print(f'{name} {table_format}: output differs from tabulate')
+                sys.exit(1)
+
+            print(f'{name:<16}{table_format:<12}{tabulate_time:>9.3f}s{native_time:>9.3f}s{tabulate_time / native_time:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
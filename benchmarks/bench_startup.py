@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Measure jtbl startup time and fail if it is over budget.
+
+    python3 benchmarks/bench_startup.py [--runs=n] [--max-import-ms=n]
+
+The import time of jtbl.cli is taken from `python -X importtime` with bytecode
+caching enabled in a temporary directory, as it would be for an installed package.
+Exits with an error if the median import time is over the budget or if tabulate is
+imported for CSV output or the built-in renderer.
+"""
+import os
+import sys
+import time
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+MAX_IMPORT_MS = 30
+RUNS = 20
+
+
+def run(args, env, stdin=None):
+    return subprocess.run(
+        [sys.executable] + args, input=stdin, env=env, cwd=ROOT,
+        capture_output=True, text=True
+    )
+
+
+def import_ms(env):
+    """return the cumulative import time of jtbl.cli in milliseconds"""
+    result = run(['-X', 'importtime', '-c', 'import jtbl.cli'], env)
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'jtbl.cli':
+            return int(fields[1]) / 1000
+    raise RuntimeError(result.stderr)
+
+
+def wall_ms(args, env, stdin):
+    """return the time it takes to run jtbl in milliseconds"""
+    start = time.perf_counter()
+    run(['-m', 'jtbl.cli'] + args, env, stdin)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if '=' in arg)
+    runs = int(options.get('runs', RUNS))
+    max_import_ms = float(options.get('max-import-ms', MAX_IMPORT_MS))
+    failed = False
+
+    with tempfile.TemporaryDirectory() as pycache:
+        env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+        # write the bytecode cache
+        import_ms(env)
+
+        median = statistics.median(import_ms(env) for _ in range(runs))
+        print(f'import jtbl.cli          {median:8.1f} ms (budget {max_import_ms:g} ms)')
+        if median > max_import_ms:
+            failed = True
+
+        stdin = '[{"name": "lo0", "mtu": 16384}]'
+        for label, args in (('table', []), ('csv', ['-c']), ('version', ['-v'])):
+            median = statistics.median(wall_ms(args, env, stdin) for _ in range(runs))
+            print(f'jtbl {" ".join(args) or "(table)":<20}{median:8.1f} ms')
+
+        for args in ([], ['-c']):
+            check = f'import sys; sys.argv = ["jtbl"] + {args!r}; import jtbl.cli\n' \
+                    'try:\n    jtbl.cli.main()\nexcept SystemExit:\n    pass\n' \
+                    'print("tabulate" in sys.modules, file=sys.stderr)'
+            result = run(['-c', check], env, stdin)
+            if result.stderr.strip().splitlines()[-1] != 'False':
+                print(f'tabulate was imported for: jtbl {" ".join(args)}')
+                failed = True
+
+    if failed:
+        print('startup time regression')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,7 @@
 _jtbl()
 {
-    OPTIONS=(--cols -c --csv -d --dokuwiki -f --fancy -h --help -H --html -m --markdown -n --no-wrap -q --quiet -r --rotate -t --truncate -v --version)
-    MOD_OPTIONS=(--cols -n --no-wrap -q --quiet -t --truncate)
+    OPTIONS=(--cols -c --csv --desc -d --dokuwiki -f --fancy --fields --follow -h --head --help -H --html --intern --jobs --json-backend -m --markdown --max-memory -n --no-wrap --profile --profile-file -q --quiet -r --rotate --sample --sort-by --sort-buffer --stream --tail --top -t --truncate -v --version --where)
+    MOD_OPTIONS=(--cols --desc --fields --follow --head --intern --jobs --json-backend --max-memory -n --no-wrap --profile --profile-file -q --quiet --sample --sort-by --sort-buffer --stream --tail --top -t --truncate --where)
 
     COMPREPLY=()
     _get_comp_words_by_ref cur prev words cword
@@ -5,26 +5,43 @@ _jtbl() {
         '--cols:manually configure the terminal width'
         '-c:CSV table output'
         '--csv:CSV table output'
+        '--desc:sort in descending order'
         '-d:DokuWiki table output'
         '--dokuwiki:DokuWiki table output'
         '-f:fancy table output'
         '--fancy:fancy table output'
+        '--fields:only display these keys'
+        '--follow:keep reading and print rows as they are added'
         '-h:help'
         '--help:help'
+        '--head:only display the first rows'
         '-H:HTML table output'
         '--html:HTML table output'
+        '--intern:share one copy of repeated keys and short values'
+        '--jobs:parse and render in multiple processes'
+        '--json-backend:decode JSON with orjson, ujson, simdjson or json'
         '-m:markdown table output'
         '--markdown:markdown table output'
+        '--max-memory:keep this many MB of rows in memory'
         '-n:do not try to wrap if too wide for the terminal'
         '--no-wrap:do not try to wrap if too wide for the terminal'
+        '--profile:print the time and memory used by each stage'
+        '--profile-file:write cProfile stats to a file'
         "-q:quiet - don't print error messages"
         "--quiet:quiet - don't print error messages"
         '-r:rotate table output'
         '--rotate:rotate table output'
+        '--sample:calculate column widths from the first rows'
+        '--sort-by:sort the rows by these keys'
+        '--sort-buffer:number of rows to sort in memory'
+        '--stream:print rows as they arrive'
+        '--tail:only display the last rows'
+        '--top:only display the first sorted rows'
         '-t:truncate data if too wide for the terminal'
         '--truncate:truncate data if too wide for the terminal'
         '-v:version info'
         '--version:version info'
+        '--where:only display rows that match an expression'
     )
 
     _describe 'commands' jtbl_options_describe
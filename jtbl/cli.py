@@ -1,30 +1,241 @@
-import io
+import os
+import math
+import re
+import mmap
+import stat
 import sys
+import itertools
+import heapq
+import operator
+import collections
 import signal
-import textwrap
-import csv
+import time
 import json
-import tabulate
-import shutil
 
-__version__ = '1.6.0'
+__version__ = '1.7.0'
 SUCCESS, ERROR = True, False
-
-# START add DokuWiki table format
-dokuwiki_format = {
-    "dokuwiki": tabulate.TableFormat(
-        lineabove=tabulate.Line("|", "-", "|", "|"),
-        linebelowheader=tabulate.Line("|", "-", "|", "|"),
-        linebetweenrows=None,
-        linebelow=None,
-        headerrow=tabulate.DataRow("^", "^", "^"),
-        datarow=tabulate.DataRow("|", "|", "|"),
-        padding=1,
-        with_header_hide=["lineabove", "linebelowheader"],
+STREAM_SAMPLE_ROWS = 100
+LIMIT_ROWS = 10
+SORT_BUFFER_ROWS = 100000
+MAX_MEMORY_MB = 1024
+FOLLOW_INTERVAL = 0.05
+FOLLOW_MAX_INTERVAL = 1.0
+STRING_OPTIONS = ('fields', 'json-backend', 'profile-file', 'sort-by', 'where')
+CHUNK_SIZE = 65536
+# the narrowest a column is made to fit the terminal, with its padding
+MIN_WRAP_WIDTH = 7
+# a value or error this close to the end of the buffer may be cut off by the chunk
+# boundary, e.g. '1.' of '1.5', '-Inf' of '-Infinity' or half of a \uXXXX\uXXXX pair
+PARTIAL_TOKEN = 16
+PARALLEL_MIN_CHUNK = 1048576
+PARALLEL_MIN_ROWS = 20000
+COMPRESSION_MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'\x28\xb5\x2f\xfd', 'zstd')
+)
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# --where tokens. Compiled when it is used to keep it out of the startup time.
+WHERE_TOKEN = r'''\s*(?:
+    (?P<number>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)(?![\w.])|
+    (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|
+    (?P<op>==|!=|<=|>=|<|>|\(|\))|
+    (?P<name>[A-Za-z_@$][\w.@$-]*)
+)'''
+WHERE_OPERATORS = {
+    '==': operator.eq, '!=': operator.ne, '<': operator.lt,
+    '<=': operator.le, '>': operator.gt, '>=': operator.ge
+}
+WHERE_CONSTANTS = {'true': True, 'false': False, 'null': None}
+WHITESPACE_BYTES = re.compile(rb'[ \t\n\r]*')
+# JSON backends and the package that provides them
+JSON_BACKENDS = {'orjson': 'orjson', 'ujson': 'ujson', 'simdjson': 'pysimdjson', 'json': 'json'}
+# backends that are used when installed, in the order they are tried. ujson accepts
+# some invalid JSON (e.g. leading zeros and raw control characters in strings), and
+# simdjson is no faster than json once its objects are converted to dictionaries, so
+# they are only used when chosen with --json-backend
+DEFAULT_JSON_BACKENDS = ('orjson', 'json')
+# integers this long may not fit in 64 bits, which the fast backends turn into floats or reject
+DIGITS = bytes.maketrans(b'123456789', b'000000000')
+BIG_NUMBER = b'0' * 19
+
+# column types for the built-in renderer, from least to most generic like tabulate
+NONE_TYPE, BOOL_TYPE, INT_TYPE, FLOAT_TYPE, STR_TYPE = range(5)
+THOUSANDS_NUMBER = re.compile(r'^(([+-]?[0-9]{1,3})(?:,([0-9]{3}))*)?(?(1)\.[0-9]*|\.[0-9]+)?$')
+MULTILINE = re.compile(r'\r|\n|\r\n')
+LINE_BREAK = re.compile(r'[\r\n]')
+
+# control characters the built-in renderer leaves to tabulate, which handles ANSI
+# escape codes, its separating line marker and measures the others with wcwidth.
+# Line breaks are handled by the built-in renderer.
+TABULATE_ONLY = re.compile(r'[\x00-\x09\x0b\x0c\x0e-\x1f\x7f-\x9f]')
+
+# table formats supported by the built-in renderer. Lines that tabulate hides when
+# there are headers are None. The last field is whether multiline cells are supported.
+TableStyle = collections.namedtuple(
+    'TableStyle',
+    'lineabove linebelowheader linebetweenrows linebelow headerrow datarow padding multiline'
+)
+TABLE_STYLES = {
+    'simple': TableStyle(
+        None, ('', '-', '  ', ''), None, None, ('', '  ', ''), ('', '  ', ''), 0, True
+    ),
+    'plain': TableStyle(
+        None, None, None, None, ('', '  ', ''), ('', '  ', ''), 0, True
+    ),
+    'fancy_grid': TableStyle(
+        ('╒', '═', '╤', '╕'), ('╞', '═', '╪', '╡'), ('├', '─', '┼', '┤'), ('╘', '═', '╧', '╛'),
+        ('│', '│', '│'), ('│', '│', '│'), 1, True
+    ),
+    'github': TableStyle(
+        None, ('|', '-', '|', '|'), None, None, ('|', '|', '|'), ('|', '|', '|'), 1, True
+    ),
+    'dokuwiki': TableStyle(
+        None, None, None, None, ('^', '^', '^'), ('|', '|', '|'), 1, False
     )
 }
-tabulate._table_formats.update(dokuwiki_format)  # type: ignore
-# END add DokuWiki table format
+RenderPlan = collections.namedtuple(
+    'RenderPlan',
+    'style column_types widths max_decimals multiline ascii_only'
+)
+
+
+class ParseError(Exception):
+    """raised by the streaming functions with a printable error message"""
+
+
+def get_tabulate():
+    """
+    Import tabulate the first time a table needs it and add the DokuWiki table format.
+    tabulate is slow to import, so it is not imported for CSV output, the built-in
+    renderer, help or version info.
+    """
+    import tabulate
+
+    if 'dokuwiki' not in tabulate._table_formats:
+        # START add DokuWiki table format
+        dokuwiki_format = {
+            "dokuwiki": tabulate.TableFormat(
+                lineabove=tabulate.Line("|", "-", "|", "|"),
+                linebelowheader=tabulate.Line("|", "-", "|", "|"),
+                linebetweenrows=None,
+                linebelow=None,
+                headerrow=tabulate.DataRow("^", "^", "^"),
+                datarow=tabulate.DataRow("|", "|", "|"),
+                padding=1,
+                with_header_hide=["lineabove", "linebelowheader"],
+            )
+        }
+        tabulate._table_formats.update(dokuwiki_format)  # type: ignore
+        # END add DokuWiki table format
+
+    return tabulate
+
+
+def get_wcswidth():
+    """
+    Return the function tabulate measures the width of wide characters with, or None
+    if wcwidth is not installed or tabulate's wide character mode is off.
+    """
+    tabulate = sys.modules.get('tabulate')
+    if tabulate is not None:
+        if getattr(tabulate, 'WIDE_CHARS_MODE', False) and getattr(tabulate, 'wcwidth', None) is not None:
+            return tabulate.wcwidth.wcswidth
+        return None
+
+    try:
+        import wcwidth
+    except ImportError:
+        return None
+
+    return wcwidth.wcswidth
+
+
+class Profile:
+    """
+    Record the wall time, CPU time, rows, columns and peak memory of each stage of
+    main() for --profile. Use as a context manager with profile.stage(name), which
+    gives a dictionary to set the rows and columns on. Does nothing unless enabled.
+
+    If cprofile_file is set, the whole run is also profiled with cProfile and the
+    stats are written to that file.
+    """
+    def __init__(self, enabled=False, cprofile_file=None):
+        self.enabled = enabled or bool(cprofile_file)
+        self.cprofile_file = cprofile_file
+        self.stages = []
+        self.current = {}
+        self.profiler = None
+        self.start = (time.perf_counter(), time.process_time())
+
+        if self.enabled:
+            import tracemalloc
+            tracemalloc.start()
+
+        if cprofile_file:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    def stage(self, name):
+        self.current = {'stage': name}
+        return self
+
+    def __enter__(self):
+        if self.enabled:
+            import tracemalloc
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            else:
+                # Python < 3.9: clearing the traces also resets the peak, so the peak
+                # only counts memory allocated during the stage
+                tracemalloc.clear_traces()
+            self.current['_start'] = (time.perf_counter(), time.process_time())
+        return self.current
+
+    def __exit__(self, *exc_info):
+        if self.enabled:
+            import tracemalloc
+            wall, cpu = self.current.pop('_start')
+            self.current['wall_ms'] = round((time.perf_counter() - wall) * 1000, 3)
+            self.current['cpu_ms'] = round((time.process_time() - cpu) * 1000, 3)
+            self.current['peak_memory_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+            self.stages.append(self.current)
+        return False
+
+    def count(self, data, stats):
+        """generator that counts the entries of data in stats['rows'] as they pass"""
+        stats['rows'] = 0
+        for stats['rows'], entry in enumerate(data, 1):
+            yield entry
+
+    def report(self):
+        """print the report as JSON to STDERR and write the cProfile stats"""
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.cprofile_file)
+
+        if not self.enabled:
+            return
+
+        wall, cpu = self.start
+        report = {
+            'stages': self.stages,
+            'total': {
+                'wall_ms': round((time.perf_counter() - wall) * 1000, 3),
+                'cpu_ms': round((time.process_time() - cpu) * 1000, 3),
+                'peak_memory_kb': max([s['peak_memory_kb'] for s in self.stages], default=0)
+            }
+        }
+        if self.cprofile_file:
+            report['cprofile_file'] = self.cprofile_file
+
+        print(json.dumps(report, indent=2), file=sys.stderr)
+
+
+NO_PROFILE = Profile()
+
 
 def ctrlc(signum, frame):
     """exit with error on SIGINT"""
@@ -39,24 +250,191 @@ def get_stdin():
         return sys.stdin.read()
 
 
+def open_file(filename):
+    """Return a tuple of (success/error, binary file object)"""
+    try:
+        return (SUCCESS, open(filename, 'rb'))
+    except OSError as e:
+        return (ERROR, f'jtbl:   Cannot open file: {e}\n')
+
+
+def get_file(filename):
+    """
+    Return a tuple of (success/error, file data) for a file name or an open binary
+    file. Regular files are memory-mapped and returned as an mmap object so the file
+    is not copied into memory.
+    """
+    if isinstance(filename, (str, bytes, os.PathLike)):
+        succeeded, filename = open_file(filename)
+        if not succeeded:
+            return (ERROR, filename)
+
+    try:
+        with filename as f:
+            try:
+                return SUCCESS, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # empty files and special files (e.g. pipes) cannot be memory-mapped
+                return SUCCESS, f.read()
+
+    except OSError as e:
+        return (ERROR, f'jtbl:   Cannot open file: {e}\n')
+
+
+def open_input(filename=None):
+    """
+    Return a tuple of (success/error, file object) for reading the file, an open
+    binary file or STDIN one chunk at a time. Compressed data is decompressed as it
+    is read.
+    """
+    if isinstance(filename, (str, bytes, os.PathLike)):
+        succeeded, binary = open_file(filename)
+        if not succeeded:
+            return (ERROR, binary)
+
+    elif filename:
+        binary = filename
+
+    elif sys.stdin.isatty():
+        return (ERROR, 'jtbl:   Missing piped data\n')
+
+    elif not hasattr(sys.stdin, 'buffer'):
+        return (SUCCESS, sys.stdin)
+
+    else:
+        binary = sys.stdin.buffer
+
+    compression = get_compression(binary.peek(6)[:6])
+    if compression:
+        return open_decompressed(binary, compression)
+
+    if not filename:
+        return (SUCCESS, sys.stdin)
+
+    return (SUCCESS, open_text(binary))
+
+
+def open_text(binary):
+    """
+    Return a text file object that decodes the binary file object the way json.loads()
+    decodes bytes: UTF-8, UTF-16 or UTF-32 detected from the first bytes, not the
+    locale encoding.
+    """
+    import io
+
+    if not hasattr(binary, 'peek'):
+        binary = io.BufferedReader(binary)
+
+    encoding = json.detect_encoding(binary.peek(4)[:4])
+    return io.TextIOWrapper(binary, encoding=encoding, errors='surrogatepass')
+
+
+def get_compression(head):
+    """return the compression format of data that starts with the bytes in head, or None"""
+    for magic, compression in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+
+def is_compressed(filename=None):
+    """
+    True if the file, the open binary file or STDIN starts with the magic bytes of a
+    compression format. An open file is peeked, so nothing is consumed from a pipe.
+    """
+    if isinstance(filename, (str, bytes, os.PathLike)):
+        try:
+            with open(filename, 'rb') as f:
+                return get_compression(f.read(6)) is not None
+        except OSError:
+            return False
+
+    if filename:
+        return get_compression(filename.peek(6)[:6]) is not None
+
+    if sys.stdin.isatty() or not hasattr(sys.stdin, 'buffer'):
+        return False
+
+    return get_compression(sys.stdin.buffer.peek(6)[:6]) is not None
+
+
+def open_decompressed(binary, compression):
+    """
+    Return a tuple of (success/error, file object) that decompresses the binary file
+    object as it is read, so the decompressed data is never in memory all at once.
+    gzip, bz2 and xz use the standard library. zstd needs the zstandard package.
+    """
+    if compression == 'gzip':
+        import gzip
+        decompressed = gzip.GzipFile(fileobj=binary, mode='rb')
+
+    elif compression == 'bz2':
+        import bz2
+        decompressed = bz2.BZ2File(binary)
+
+    elif compression == 'xz':
+        import lzma
+        decompressed = lzma.LZMAFile(binary)
+
+    else:
+        try:
+            import zstandard
+        except ImportError:
+            return (ERROR, 'jtbl:   Cannot read zstd compressed data: the zstandard package is not installed\n')
+        decompressed = zstandard.ZstdDecompressor().stream_reader(binary)
+
+    return (SUCCESS, open_text(decompressed))
+
+
 def helptext():
+    import textwrap
+
     print_error(textwrap.dedent('''\
         jtbl:   Converts JSON and JSON Lines to a table
 
         Usage:  <JSON Data> | jtbl [OPTIONS]
+                jtbl [OPTIONS] FILE
 
                 --cols=n           manually configure the terminal width
                 -c, --csv          CSV table output
+                --desc             sort in descending order
                 -d, --dokuwiki     DokuWiki table output
                 -f, --fancy        fancy table output
+                --fields=a,b,c     only display these keys, in this order
+                --follow           keep reading and print rows as they are added
+                                   to the file or STDIN
                 -h, --help         help
+                --intern[=n]       share one copy of repeated keys, and of string
+                                   values of up to n characters, between rows
+                --head[=n]         only display the first n rows (default 10)
+                --jobs[=n]         parse JSON Lines and render tables in n processes
+                                   (default all CPUs)
+                --json-backend=B   decode JSON with orjson, ujson, simdjson or json
+                                   (default orjson if installed)
+                --max-memory[=n]   keep about n MB of rows in memory and write the
+                                   rest to temporary files (default 1024)
                 -H, --html         HTML table output
                 -m, --markdown     markdown table output
                 -n, --no-wrap      do not try to wrap if too wide for the terminal
+                --profile          print the time and memory used by each stage to
+                                   STDERR as JSON
+                --profile-file=F   also write cProfile stats to file F
                 -q, --quiet        quiet - don't print error messages
                 -r, --rotate       rotate table output
+                --sample[=n]       calculate column widths from the first n rows
+                                   (default 100)
+                --sort-by=a,b      sort the rows by these keys
+                --sort-buffer=n    sort n rows in memory at a time before using
+                                   temporary files (default 100000)
+                --stream[=n]       print rows as they arrive. Column widths are
+                                   calculated from the first n rows (default 100)
+                --tail[=n]         only display the last n rows (default 10)
+                --top=n            only display the first n sorted rows
                 -t, --truncate     truncate data if too wide for the terminal
                 -v, --version      version info
+                --where=EXPR       only display rows that match EXPR, e.g.
+                                   'status >= 500 and host == "a"'
     '''))
 
 
@@ -67,108 +445,1082 @@ def print_error(message, quiet=False):
     sys.exit(1)
 
 
-def wrap(data, columns, table_format, truncate):
+class RowStore:
+    """
+    Rows that can be read in order more than once, with a memory budget of max_bytes.
+    Rows are kept in memory until they use about half of the budget. Then they are
+    written to a temporary file as a marshal batch. Batches are read back one at a
+    time, so the other half of the budget is left for the batch being formatted.
+    """
+    def __init__(self, rows=(), max_bytes=MAX_MEMORY_MB * 1048576):
+        self.max_bytes = max_bytes
+        self.buffer = []
+        self.buffer_bytes = 0
+        self.spilled = []
+        self.spill = None
+        self.length = 0
+        for row in rows:
+            self.append(row)
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.batches())
+
+    def append(self, row):
+        """add a row, writing the rows in memory to the temporary file when over budget"""
+        self.buffer.append(row)
+        self.length += 1
+        self.buffer_bytes += _row_size(row)
+        if self.buffer_bytes >= self.max_bytes // 2:
+            self.flush()
+
+    def flush(self):
+        """write the rows in memory to the temporary file as one batch"""
+        import marshal
+        import tempfile
+
+        if not self.buffer:
+            return
+
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile()
+
+        batch = marshal.dumps(self.buffer)
+        self.spill.seek(0, os.SEEK_END)
+        self.spilled.append((self.spill.tell(), len(batch)))
+        self.spill.write(batch)
+        self.buffer = []
+        self.buffer_bytes = 0
+
+    def batches(self):
+        """Generator that yields the rows in lists. Only one batch is read into memory at a time"""
+        import marshal
+
+        if self.spilled:
+            self.flush()
+
+        for offset, size in self.spilled:
+            self.spill.seek(offset)
+            yield marshal.loads(self.spill.read(size))
+
+        if self.buffer:
+            yield self.buffer
+
+    def close(self):
+        """remove the temporary file"""
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+            self.spilled = []
+
+
+def _row_size(row):
+    """approximate number of bytes used by a row, its keys and its values"""
+    if isinstance(row, dict):
+        return sys.getsizeof(row) + sum(map(sys.getsizeof, row)) + sum(map(sys.getsizeof, row.values()))
+
+    return sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+
+
+class Table:
+    """
+    Compact table used by the renderers. headers is a list of column names, index maps
+    a column name to its position and rows is a list of tuples of values in header
+    order. Missing values are None.
+    """
+    __slots__ = ('headers', 'index', 'rows')
+
+    def __init__(self, headers=(), rows=None):
+        self.headers = list(headers)
+        self.index = {k: i for i, k in enumerate(self.headers)}
+        self.rows = [] if rows is None else rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    @classmethod
+    def from_dicts(cls, data):
+        """build a Table from a dictionary or a list of dictionaries"""
+        if isinstance(data, cls):
+            return data
+
+        if isinstance(data, dict):
+            data = [data] if data else []
+
+        headers = list(get_headers(data))
+        if isinstance(data, RowStore):
+            return cls(headers, RowStore((tuple(map(entry.get, headers)) for entry in data), max_bytes=data.max_bytes))
+
+        return cls(headers, [tuple(map(entry.get, headers)) for entry in data])
+
+
+def wrap(data, columns, table_format, truncate, sample=None):
     """
     Wrap or truncate the data to fit the terminal width.
 
+    If sample is set, column widths are planned from the first sample rows only and
+    values in later rows that are wider than the planned widths are wrapped or truncated.
+
     Returns a tuple of (data, table_format)
-        data (list)     a modified list of dictionies with wrapped or truncated string values.
-                        wrapping is achieved by inserting \n characters into the value strings.
+        data (Table)    a Table with wrapped or truncated string values. wrapping is
+                        achieved by inserting \n characters into the value strings.
+                        data can be a Table or a list of dictionaries.
 
         table_format (string)   'simple' (for truncation) or 'fancy_grid' (for wrapping)
     """
-    # find the length of the keys (headers) and longest values
-    data_width = {}
-    for entry in data:
-        for k, v in entry.items():
-            if k in data_width:
-                if len(str(v)) > data_width[k]:
-                    data_width[k] = len(str(v))
-            else:
-                data_width[k] = len(str(v))
-
-    # highest_value calculations are only approximate since there can be left and right justification
-    num_of_headers = len(data_width.keys())
+    table = Table.from_dicts(data)
+
+    # stringify every value once. The strings are used to find the longest values
+    # and are reused when wrapping or truncating. The rows of a RowStore are only
+    # measured here and stringified again as they are wrapped, so they stay on disk.
+    in_memory = not isinstance(table.rows, RowStore)
+    str_rows = []
+    measured = 0
+    data_width = [0] * len(table.headers)
+    # numbers are aligned on the decimal point, so the widest integer part and the most
+    # decimals can be in different values
+    int_width = [0] * len(table.headers)
+    decimals_width = [0] * len(table.headers)
+    for row in itertools.islice(table.rows, sample):
+        str_row = tuple('' if v is None else str(v) for v in row)
+        for i, str_v in enumerate(str_row):
+            # missing and null values are measured as 'None'
+            width = len(str_v) or (4 if row[i] is None else 0)
+            if width > data_width[i]:
+                data_width[i] = width
+
+            value_type = type(row[i])
+            if value_type is int or value_type is float:
+                point = str_v.find('.')
+                if point == -1:
+                    point = width
+                if point > int_width[i]:
+                    int_width[i] = point
+                if width - point > decimals_width[i]:
+                    decimals_width[i] = width - point
+
+        if in_memory:
+            str_rows.append(str_row)
+        measured += 1
+
+    sampled = measured < len(table.rows)
+    data_width = [max(width, int_width[i] + decimals_width[i]) for i, width in enumerate(data_width)]
+
+    # the width of each column with its padding. Headers are padded with at least two
+    # spaces, like tabulate.
+    num_of_headers = len(table.headers)
     combined_total_list = []
-    for k, v in data_width.items():
+    for k, v in zip(table.headers, data_width):
         highest_value = max(len(k) + 4, v + 2)
         combined_total_list.append(highest_value)
 
-    total_width = sum(combined_total_list)
-
-    new_table = []
-    if total_width > columns:
-        # Find the best wrap_width based on the terminal size
-        sorted_list = sorted(combined_total_list, reverse=True)
-        wrap_width = sorted_list[0]
-        scale = 2.5 if truncate else 4.5
-
-        while wrap_width > 4 and total_width >= (columns - (num_of_headers * scale)):
-            sorted_list = sorted(sorted_list, reverse=True)
-            sorted_list[0] -= 1
-            total_width = sum(sorted_list)
-            wrap_width = sorted_list[0]
-
-        # truncate or wrap every wrap_width chars for all field values
-        for entry in data:
-            add_keys = {}
-            for k, v in entry.items():
-                if v is None:
-                    v = ''
-
-                if truncate:
-                    new_key = str(k)[0:wrap_width]
-                    new_value = str(v)[0:wrap_width]
-                    add_keys[new_key] = new_value
+    def border_width(table_format):
+        # fancy_grid draws a border between and around the columns. simple tables
+        # separate the columns with two spaces and have no padding at the edges
+        return num_of_headers + 1 if table_format == 'fancy_grid' else -2
+
+    fits = sum(combined_total_list) + border_width(table_format) <= columns
+    if fits and not sampled:
+        return (table, table_format)
+
+    # give each column its own width: columns narrower than their share keep their
+    # width and the others share what is left (see fit_widths())
+    fit_width_list = combined_total_list
+    if not fits:
+        if not truncate:
+            table_format = 'fancy_grid'
+        fit_width = columns - border_width(table_format)
+        # numbers are not narrowed below their width, so they are not split, unless
+        # the table cannot fit that way
+        min_widths = [
+            min(width, max(MIN_WRAP_WIDTH, int_width[i] + decimals_width[i] + 2))
+            for i, width in enumerate(combined_total_list)
+        ]
+        if sum(min_widths) > fit_width:
+            min_widths = MIN_WRAP_WIDTH
+        fit_width_list = fit_widths(combined_total_list, fit_width, min_width=min_widths)
+
+        # hand the width left over by rounding to the narrowed columns, from the left
+        left_over = fit_width - sum(fit_width_list)
+        for i, width in enumerate(combined_total_list):
+            if left_over <= 0:
+                break
+            if fit_width_list[i] < width:
+                fit_width_list[i] += 1
+                left_over -= 1
+
+    if truncate:
+        def fit(value, width):
+            return value[0:width]
+    else:
+        def fit(value, width):
+            if len(value) <= width:
+                return value
+            return '\n'.join([value[i:i + width] for i in range(0, len(value), width)])
+
+    # truncate or wrap the values of the columns that were narrowed to the width of the
+    # column without its padding, and their headers two characters narrower. the header
+    # and values of other columns already fit, except for values in rows that were not
+    # sampled, which are fit to the width planned for the column.
+    widths = []
+    header_widths = []
+    for width, fit_width in zip(combined_total_list, fit_width_list):
+        if fit_width < width:
+            widths.append(fit_width - 2)
+            header_widths.append(fit_width - 4)
+        elif sampled:
+            widths.append(width - 2)
+            header_widths.append(None)
+        else:
+            widths.append(None)
+            header_widths.append(None)
+
+    new_headers = [str(k) if w is None else fit(str(k), w) for k, w in zip(table.headers, header_widths)]
+    if not in_memory:
+        new_rows = RowStore((
+            tuple([v if w is None else fit(v, w) for v, w in zip(('' if v is None else str(v) for v in row), widths)])
+            for row in table.rows
+        ), max_bytes=table.rows.max_bytes)
+        return (Table(new_headers, new_rows), table_format)
+
+    if sampled:
+        str_rows.extend(tuple('' if v is None else str(v) for v in row) for row in table.rows[len(str_rows):])
+
+    if any(w is not None for w in widths):
+        new_rows = [
+            tuple([v if w is None else fit(v, w) for v, w in zip(str_row, widths)])
+            for str_row in str_rows
+        ]
+    else:
+        new_rows = str_rows
+
+    return (Table(new_headers, new_rows), table_format)
 
-                else:
-                    table_format = 'fancy_grid'
-                    new_key = '\n'.join([str(k)[i:i + wrap_width] for i in range(0, len(str(k)), wrap_width)])
-                    new_value = '\n'.join([str(v)[i:i + wrap_width] for i in range(0, len(str(v)), wrap_width)])
-                    add_keys[new_key] = new_value
 
-            new_table.append(add_keys)
+def _text_type(json_data):
+    """return the whitespace pattern and newline for str or bytes-like (e.g. mmap) data"""
+    if isinstance(json_data, str):
+        return WHITESPACE, '\n'
+    return WHITESPACE_BYTES, b'\n'
+
+
+def sniff_json(json_data, start=0):
+    """
+    Return 'lines' if json_data is JSON Lines or 'document' if it is a single JSON
+    document. start is the offset of the first non-whitespace character.
+
+    The data is JSON Lines if the first line is a complete JSON value and there is
+    more data after it, since that can never be a valid single document.
+    """
+    whitespace, newline_char = _text_type(json_data)
+    newline = json_data.find(newline_char, start)
+    if newline == -1 or whitespace.match(json_data, newline).end() == len(json_data):
+        return 'document'
+
+    try:
+        json.loads(json_data[start:newline])
+    except Exception:
+        return 'document'
+
+    return 'lines'
+
+
+def make_decoder(intern=None):
+    """
+    Return a json.JSONDecoder. If intern is not None, the keys of every object, and
+    the string values of up to intern characters, are replaced by one shared copy of
+    each string as they are decoded, so rows of repetitive JSON Lines do not each
+    hold their own copies.
+    """
+    if intern is None:
+        return json.JSONDecoder()
+
+    table = {}
+    setdefault = table.setdefault
+
+    if intern:
+        def intern_pairs(pairs):
+            return {
+                setdefault(k, k): setdefault(v, v) if type(v) is str and len(v) <= intern else v
+                for k, v in pairs
+            }
+    else:
+        def intern_pairs(pairs):
+            return {setdefault(k, k): v for k, v in pairs}
+
+    return json.JSONDecoder(object_pairs_hook=intern_pairs)
+
+
+def get_json_backend(name=None):
+    """
+    Return a tuple of (success/error, name of the JSON backend). If name is None, the
+    first of DEFAULT_JSON_BACKENDS that is installed is used. json is always available.
+    """
+    import importlib
+
+    if name is not None and name not in JSON_BACKENDS:
+        return (ERROR, f'jtbl:   Unknown JSON backend: {name} (use one of {", ".join(JSON_BACKENDS)})\n')
+
+    for backend in [name] if name else DEFAULT_JSON_BACKENDS:
+        try:
+            importlib.import_module(backend)
+        except ImportError:
+            continue
+        return (SUCCESS, backend)
+
+    return (ERROR, f'jtbl:   Cannot use the {name} JSON backend: the {JSON_BACKENDS[name]} package is not installed\n')
+
+
+def has_big_number(s):
+    """return True if s has a run of 19 or more digits, which may be a 64-bit integer"""
+    if isinstance(s, str):
+        s = s.encode('utf-8', 'surrogatepass')
+    return BIG_NUMBER in s.translate(DIGITS)
+
+
+def make_loads(intern=None, backend=None):
+    """
+    Return a function like json.loads() for a JSON backend (see get_json_backend()).
+    Input that a fast backend rejects, and input with integers or a byte order mark it
+    may not decode the same way, is decoded with the json module instead, so the
+    results and the error messages are the same as with json.loads(). ujson also
+    accepts some invalid JSON, which json.loads() would reject. If intern is not None,
+    the json module decodes with make_decoder(intern).
+    """
+    if intern is None:
+        succeeded, backend = get_json_backend(backend)
+        if not succeeded or backend == 'json':
+            return json.loads
+
+        backend_loads = sys.modules[backend].loads
+
+        def loads(s):
+            if isinstance(s, str) and s.startswith('\ufeff'):
+                # let json.loads() raise its error for a byte order mark
+                return json.loads(s)
+            if not has_big_number(s):
+                try:
+                    return backend_loads(s)
+                except Exception:
+                    pass
+            return json.loads(s)
+
+        return loads
 
-    return (new_table or data, table_format)
+    decoder = make_decoder(intern)
 
+    def loads(s):
+        if not isinstance(s, str):
+            s = s.decode(json.detect_encoding(s), 'surrogatepass')
+        if s.startswith('\ufeff'):
+            # let json.loads() raise its error for a byte order mark
+            return json.loads(s)
+        return decoder.decode(s)
 
-def get_json(json_data, columns=None):
+    return loads
+
+
+def get_json(json_data, columns=None, jobs=1, fields=None, where=None, intern=None, backend=None):
     """Accepts JSON or JSON Lines and returns a tuple of
        (success/error, list of dictionaries)
+
+       json_data can be a string or a bytes-like object such as an mmap. JSON Lines
+       are decoded one line at a time directly from the buffer, or in a pool of
+       processes if jobs is more than 1. If fields is a list of keys, only those keys
+       are kept in each dictionary. If where is a --where expression, only the
+       entries that match it are kept. A top-level array is then decoded one element
+       at a time. If intern is not None, repeated keys and short values share one
+       copy (see make_decoder()). backend is the JSON backend (see get_json_backend()).
     """
-    if not json_data or json_data.isspace():
+    if not json_data:
         return (ERROR, 'jtbl:   Missing piped data\n')
 
-    try:
-        data = json.loads(json_data)
+    whitespace, _ = _text_type(json_data)
+    start = whitespace.match(json_data).end()
+    if start == len(json_data):
+        return (ERROR, 'jtbl:   Missing piped data\n')
+
+    if sniff_json(json_data, start) == 'document':
+        head = None
+        if fields is not None or where is not None:
+            head = json_data[start:start + 1]
+            if not isinstance(json_data, str):
+                # decode the start of the data like json.loads(), skipping a byte order mark
+                encoding = json.detect_encoding(json_data[:4])
+                head = str(json_data[:64], encoding, 'ignore').lstrip(' \t\n\r')[:1]
+
+        if head == '[':
+            # decode the array one element at a time and keep only the selected keys
+            # of each element, so the other values are never held for every entry
+            import io
+
+            if isinstance(json_data, str):
+                fp = io.StringIO(json_data)
+            else:
+                # bytes are decoded one chunk at a time as the elements are read
+                fp = io.TextIOWrapper(io.BytesIO(json_data), encoding=encoding, errors='surrogatepass', newline='')
+
+            try:
+                data = list(filter_rows(iter_json_array(fp, columns=columns, intern=intern), fields, where))
+            except ParseError as e:
+                return (ERROR, str(e))
+
+            return SUCCESS, data
+
+        try:
+            data = make_loads(intern, backend)(json_data if isinstance(json_data, (str, bytes)) else json_data[:])
+        except Exception as e:
+            # report the line with the error using the position from the exception.
+            # e.doc is the decoded document so the position is correct for bytes, too.
+            doc = getattr(e, 'doc', '')
+            pos = getattr(e, 'pos', 0)
+            line_start = doc.rfind('\n', 0, pos) + 1
+            line_end = doc.find('\n', pos)
+            if line_end == -1:
+                line_end = len(doc)
+            jsonline = doc[line_start:line_end].rstrip('\r')
+            return (ERROR, line_error(e, getattr(e, 'lineno', 1), jsonline, columns))
+
         if type(data) is not list:
             data_list = []
             data_list.append(data)
             data = data_list
 
+        if where is not None:
+            _, keep = compile_where(where)
+            data = [entry for entry in data if keep(entry)]
+
+        if fields is not None:
+            data = [select_fields(entry, fields) for entry in data]
+
         return SUCCESS, data
 
-    except Exception:
-        # if json.loads fails, assume the data is formatted as json lines and parse
-        data = json_data.splitlines()
-        data_list = []
-        for i, jsonline in enumerate(data):
+    if jobs > 1 and len(json_data) > PARALLEL_MIN_CHUNK:
+        return parse_json_lines_parallel(
+            json_data, columns=columns, jobs=jobs, fields=fields, where=where, intern=intern, backend=backend
+        )
+
+    return parse_json_lines(json_data, columns=columns, fields=fields, where=where, intern=intern, backend=backend)
+
+
+def select_fields(entry, fields):
+    """
+    Return a dictionary with the keys in fields, in that order. Keys that are missing
+    from entry are set to None so every field has a column. entry is returned
+    unchanged if it is not a dictionary.
+    """
+    if not isinstance(entry, dict):
+        return entry
+
+    return {k: entry.get(k) for k in fields}
+
+
+def compile_where(expression):
+    """
+    Compile a --where expression into a function that accepts an entry and returns
+    True if it should be displayed. Returns a tuple of (success/error, function)
+
+    Expressions compare keys with values, e.g. 'status>=500 and host=="a"'. Operators
+    are == != < <= > >=, combined with and, or, not and parentheses. Values are
+    numbers, "strings", true, false and null. A key on its own is true if its value
+    is. Nested keys can be written as a.b when there is no 'a.b' key.
+    """
+    where_token = re.compile(WHERE_TOKEN, re.VERBOSE)
+    tokens = []
+    pos = 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = where_token.match(expression, pos)
+        if not match or match.end() == pos:
+            return (ERROR, f'jtbl:   Invalid --where expression at: {expression[pos:].strip()}\n')
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        pos = match.end()
+
+    tokens.append((None, None))
+    pos = 0
+
+    def peek(*values):
+        return tokens[pos][1] in values and tokens[pos][0] in ('op', 'name')
+
+    def advance():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def operand():
+        kind, text = advance()
+        if kind == 'number':
+            value = json.loads(text)
+            return lambda entry: value
+        if kind == 'string':
+            if text[0] == "'":
+                text = '"' + text[1:-1].replace("\\'", "'").replace('"', '\\"') + '"'
+            value = json.loads(text)
+            return lambda entry: value
+        if kind == 'name' and text in WHERE_CONSTANTS:
+            value = WHERE_CONSTANTS[text]
+            return lambda entry: value
+        if kind == 'name' and text not in ('and', 'or', 'not'):
+            return key_getter(text)
+        if text == '(':
+            predicate = either()
+            if advance()[1] != ')':
+                raise ValueError('missing )')
+            return predicate
+
+        raise ValueError(f'unexpected {text or "end of expression"}')
+
+    def comparison():
+        left = operand()
+        if tokens[pos][0] != 'op' or tokens[pos][1] not in WHERE_OPERATORS:
+            return lambda entry: bool(left(entry))
+
+        compare = WHERE_OPERATORS[advance()[1]]
+        right = operand()
+
+        def predicate(entry):
+            left_value = left(entry)
+            right_value = right(entry)
+            # true and false are not the numbers 1 and 0 in JSON
+            if (left_value.__class__ is bool) is not (right_value.__class__ is bool):
+                return compare is operator.ne
+            try:
+                return compare(left_value, right_value)
+            except TypeError:
+                # values of different types (e.g. a string and a number) do not match
+                return False
+
+        return predicate
+
+    def negation():
+        if peek('not'):
+            advance()
+            predicate = negation()
+            return lambda entry: not predicate(entry)
+        return comparison()
+
+    def both():
+        predicates = [negation()]
+        while peek('and'):
+            advance()
+            predicates.append(negation())
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda entry: all(predicate(entry) for predicate in predicates)
+
+    def either():
+        predicates = [both()]
+        while peek('or'):
+            advance()
+            predicates.append(both())
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda entry: any(predicate(entry) for predicate in predicates)
+
+    try:
+        predicate = either()
+        if tokens[pos][0] is not None:
+            raise ValueError(f'unexpected {tokens[pos][1]}')
+    except (ValueError, IndexError) as e:
+        return (ERROR, f'jtbl:   Invalid --where expression: {e}\n')
+
+    return (SUCCESS, predicate)
+
+
+def sort_fields(fields, sort_by):
+    """
+    Return the keys to keep while parsing so the rows can be sorted by keys that are
+    not in fields. Only the top-level key of a nested a.b sort key is kept, since the
+    dotted key itself would be kept as a missing key with a null value.
+    """
+    return list(dict.fromkeys(fields + [key.split('.')[0] for key in sort_by]))
+
+
+def key_getter(key):
+    """return a function that gets the value of key, or a nested a.b key, from an entry"""
+    path = key.split('.')
+
+    def get(entry):
+        if not isinstance(entry, dict):
+            return None
+        if key in entry or len(path) == 1:
+            return entry.get(key)
+        for part in path:
+            if not isinstance(entry, dict):
+                return None
+            entry = entry.get(part)
+        return entry
+
+    return get
+
+
+def parse_json_lines(json_data, columns=None, line_num=0, fields=None, where=None, intern=None, backend=None):
+    """
+    Parse JSON Lines from a string or bytes-like object. line_num is the number of
+    lines before json_data, for error messages. If fields is a list of keys, only
+    those keys are kept in each entry. If where is a --where expression, only the
+    entries that match it are kept. intern and backend are passed to make_loads().
+
+    Returns a tuple of (success/error, list of entries)
+    """
+    whitespace, newline_char = _text_type(json_data)
+    loads = make_loads(intern, backend)
+    keep = None
+    if where is not None:
+        _, keep = compile_where(where)
+
+    # parse the JSON Lines in place without making a copy of the data with splitlines()
+    data_list = []
+    pos = 0
+    while pos < len(json_data):
+        line_num += 1
+        end = json_data.find(newline_char, pos)
+        if end == -1:
+            end = len(json_data)
+
+        # skip blank lines
+        if whitespace.match(json_data, pos, end).end() < end:
+            jsonline = json_data[pos:end]
             try:
-                if jsonline.strip():
-                    entry = json.loads(jsonline)
-                    data_list.append(entry)
+                entry = loads(jsonline)
             except Exception as e:
                 # can't parse the data. Throw a nice message and quit
-                return (ERROR, textwrap.dedent(f'''\
-                    jtbl:  Exception - {e}
-                           Cannot parse line {i + 1} (Not JSON or JSON Lines data):
-                           {str(jsonline)[0:columns - 8]}
-                            '''))
-        return SUCCESS, data_list
+                if not isinstance(jsonline, str):
+                    jsonline = jsonline.decode('utf-8', errors='replace')
+                return (ERROR, line_error(e, line_num, jsonline.rstrip('\r'), columns))
+
+            if keep is None or keep(entry):
+                if fields is not None:
+                    entry = select_fields(entry, fields)
+                data_list.append(entry)
+
+        pos = end + 1
+
+    return SUCCESS, data_list
+
+
+def parse_json_lines_parallel(json_data, columns=None, jobs=2, fields=None, where=None, intern=None, backend=None):
+    """
+    Parse JSON Lines in a pool of jobs processes. The data is split into chunks at
+    line boundaries and the results are merged in their original order. Only a few
+    chunks per process are in flight at a time to bound memory use.
+
+    Returns a tuple of (success/error, list of entries)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    _, newline_char = _text_type(json_data)
+    chunk_size = max(len(json_data) // (jobs * 4), PARALLEL_MIN_CHUNK)
+
+    def chunks():
+        pos = 0
+        line_num = 0
+        while pos < len(json_data):
+            end = json_data.find(newline_char, pos + chunk_size)
+            end = len(json_data) if end == -1 else end + 1
+            chunk = json_data[pos:end]
+            yield chunk, line_num
+            line_num += chunk.count(newline_char)
+            pos = end
+
+    data_list = []
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        for chunk, line_num in chunks():
+            pending.append(executor.submit(parse_json_lines, chunk, columns, line_num, fields, where, intern, backend))
+            if len(pending) > jobs * 2:
+                succeeded, result = pending.popleft().result()
+                if not succeeded:
+                    return ERROR, result
+                data_list.extend(result)
+
+        while pending:
+            succeeded, result = pending.popleft().result()
+            if not succeeded:
+                return ERROR, result
+            data_list.extend(result)
+
+    return SUCCESS, data_list
+
+
+def line_error(exception, line_num, jsonline, columns):
+    """return the error message for a line that cannot be parsed"""
+    import textwrap
+
+    return textwrap.dedent(f'''\
+        jtbl:  Exception - {exception}
+               Cannot parse line {line_num} (Not JSON or JSON Lines data):
+               {str(jsonline)[0:columns - 8]}
+                ''')
+
+
+def iter_json_lines(lines, columns=None, intern=None, backend=None):
+    """
+    Generator that accepts an iterable of JSON Lines (e.g. a file object) and yields
+    one parsed entry at a time. intern and backend are passed to make_loads(). Raises
+    ParseError if a line cannot be parsed.
+    """
+    loads = make_loads(intern, backend)
+    for i, jsonline in enumerate(lines):
+        if not jsonline.strip():
+            continue
+
+        try:
+            entry = loads(jsonline)
+        except Exception as e:
+            raise ParseError(line_error(e, i + 1, jsonline.rstrip('\r\n'), columns))
+
+        yield entry
+
+
+def follow_lines(fp, interval=FOLLOW_INTERVAL, max_interval=FOLLOW_MAX_INTERVAL):
+    """
+    Generator that yields complete lines from a file object like tail -f. Pipes are
+    read with blocking reads until they are closed. When the end of a regular file is
+    reached, the file is polled for new lines, waiting up to twice as long after each
+    poll that finds nothing (up to max_interval seconds). A truncated file is read
+    again from the start. Decompressed files are read like pipes, since their size
+    on disk cannot be compared with the position in the decompressed text.
+    """
+    import io
+
+    try:
+        regular = (stat.S_ISREG(os.fstat(fp.fileno()).st_mode)
+                   and isinstance(getattr(fp, 'buffer', None), io.BufferedReader))
+    except (AttributeError, OSError, ValueError):
+        regular = False
+
+    pending = ''
+    wait = interval
+    while True:
+        line = fp.readline()
+        if line:
+            wait = interval
+            pending += line
+            if pending.endswith('\n'):
+                yield pending
+                pending = ''
+            continue
+
+        if not regular:
+            break
+
+        try:
+            if os.fstat(fp.fileno()).st_size < fp.tell():
+                fp.seek(0)
+                pending = ''
+                continue
+        except (OSError, ValueError):
+            pass
+
+        time.sleep(wait)
+        wait = min(wait * 2, max_interval)
+
+    if pending:
+        yield pending
+
+
+def iter_json_array(fp, columns=None, buffer='', chunk_size=CHUNK_SIZE, intern=None):
+    """
+    Generator that incrementally decodes a top-level JSON array from a file object and
+    yields one element at a time. Only the element being decoded and a chunk of the
+    source text are held in memory. buffer is text that was already read from fp.
+    intern is passed to make_decoder().
+
+    Raises ParseError if the array cannot be parsed.
+    """
+    decoder = make_decoder(intern)
+    pos = 0             # current position in buffer
+    offset = 0          # absolute offset of buffer[0] in the source
+    line_num = 1        # line number of buffer[0]
+    line_start = 0      # absolute offset of the start of that line
+    line_prefix = ''    # the start of that line if it is before buffer[0], for errors
+    eof = False
+    expect = 'open'
+
+    def error(msg, err_pos):
+        err_line = line_num + buffer.count('\n', 0, err_pos)
+        last_nl = buffer.rfind('\n', 0, err_pos)
+        if last_nl == -1:
+            err_col = offset + err_pos - line_start + 1
+        else:
+            err_col = err_pos - last_nl
+        line_end = buffer.find('\n', err_pos)
+        line = buffer[last_nl + 1:line_end if line_end != -1 else len(buffer)]
+        if last_nl == -1:
+            line = line_prefix + line
+        # read the rest of the line, up to as much as the message can display
+        while line_end == -1 and columns is not None and len(line) < columns:
+            chunk = fp.read(columns)
+            if not chunk:
+                break
+            line_end = chunk.find('\n')
+            line += chunk if line_end == -1 else chunk[:line_end]
+        line = line.rstrip('\r')
+        message = f'{msg}: line {err_line} column {err_col} (char {offset + err_pos})'
+        return ParseError(line_error(message, err_line, line, columns))
+
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+
+        if pos == len(buffer) or expect == 'retry':
+            if eof:
+                if expect == 'close':
+                    return
+                if expect == 'separator':
+                    raise error('Expecting \',\' delimiter', pos)
+                raise error('Expecting value', pos)
+
+            # slide the window: drop the consumed text and read at least as much
+            # as is still buffered so a large element is re-scanned a bounded
+            # number of times
+            line_num += buffer.count('\n', 0, pos)
+            last_nl = buffer.rfind('\n', 0, pos)
+            if last_nl != -1:
+                line_start = offset + last_nl + 1
+                line_prefix = ''
+            # only as much of the line is kept as an error message can display
+            line_prefix = (line_prefix + buffer[last_nl + 1:pos])[:columns]
+            offset += pos
+            buffer = buffer[pos:]
+            pos = 0
+
+            chunk = fp.read(max(chunk_size, len(buffer)))
+            if not chunk:
+                eof = True
+            buffer += chunk
+
+            if expect == 'retry':
+                expect = 'value'
+            continue
+
+        char = buffer[pos]
+
+        if expect == 'open':
+            if char != '[':
+                raise error('Expecting \'[\'', pos)
+            pos += 1
+            expect = 'first'
+
+        elif expect == 'close':
+            # only whitespace is allowed after the array
+            raise error('Extra data', pos)
+
+        elif expect == 'separator':
+            if char == ',':
+                pos += 1
+                expect = 'value'
+            elif char == ']':
+                pos += 1
+                expect = 'close'
+            else:
+                raise error('Expecting \',\' delimiter', pos)
+
+        elif expect == 'first' and char == ']':
+            pos += 1
+            expect = 'close'
+
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # only an error at the end of the buffer, or a string that runs to
+                # the end, may be fixed by reading more. Anything else is reported
+                # at once instead of reading the rest of the input into the buffer
+                if eof or (e.pos < len(buffer) - PARTIAL_TOKEN and not e.msg.startswith('Unterminated string')):
+                    raise error(e.msg, e.pos)
+                expect = 'retry'
+                continue
+
+            # a number or literal at the end of the buffer may continue in the next chunk
+            if end > len(buffer) - PARTIAL_TOKEN and not eof:
+                expect = 'retry'
+                continue
+
+            pos = end
+            expect = 'separator'
+            yield value
+
+
+def iter_json(fp, columns=None, chunk_size=CHUNK_SIZE, fields=None, where=None, intern=None, backend=None):
+    """
+    Generator that accepts a file object with a JSON array or JSON Lines and yields one
+    entry at a time without reading the whole input into memory. If fields is a list
+    of keys, only those keys are kept in each entry. If where is a --where expression,
+    only the entries that match it are yielded. intern and backend are passed to
+    make_loads(). A top-level JSON array is decoded one element at a time with the
+    json module.
+
+    Raises ParseError if the data cannot be parsed or there is no data.
+    """
+    import io
+
+    if fields is not None or where is not None:
+        yield from filter_rows(iter_json(fp, columns=columns, chunk_size=chunk_size, intern=intern, backend=backend), fields, where)
+        return
+
+    buffer = ''
+    while True:
+        chunk = fp.read(chunk_size)
+        buffer += chunk
+        start = WHITESPACE.match(buffer).end()
+        if start < len(buffer) or not chunk:
+            break
+
+    if start == len(buffer):
+        raise ParseError('jtbl:   Missing piped data\n')
+
+    if buffer[start:start + 1] == '[':
+        yield from iter_json_array(fp, columns=columns, buffer=buffer, chunk_size=chunk_size, intern=intern)
+        return
+
+    # rejoin the partial line at the end of the first chunk with the rest of the line
+    lines = io.StringIO(buffer).readlines()
+    if lines and not lines[-1].endswith('\n'):
+        lines[-1] += fp.readline()
+
+    entries = iter_json_lines(itertools.chain(lines, fp), columns=columns, intern=intern, backend=backend)
+    try:
+        first = next(entries)
+    except StopIteration:
+        return
+    except ParseError:
+        # a single JSON document that spans more than one line
+        succeeded, result = get_json(''.join(lines) + fp.read(), columns=columns, intern=intern, backend=backend)
+        if not succeeded:
+            raise ParseError(result)
+        yield from result
+        return
+
+    yield first
+    yield from entries
+
+
+def filter_rows(data, fields=None, where=None):
+    """
+    Generator that yields the entries that match the where expression, with only the
+    keys in fields if fields is a list of keys.
+    """
+    keep = None
+    if where is not None:
+        _, keep = compile_where(where)
+
+    for entry in data:
+        if keep is None or keep(entry):
+            yield entry if fields is None else select_fields(entry, fields)
+
+
+def json_order(value):
+    """
+    Return a key that orders JSON values of any type: null, false, true, numbers,
+    strings, then arrays and objects.
+    """
+    if value is None:
+        return (0, 0)
+    if value.__class__ is bool:
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, json.dumps(value, sort_keys=True))
+
+
+def sort_key_getter(keys):
+    """return a sort key function for entries from a list of keys. Missing keys are null"""
+    getters = [key_getter(key) for key in keys]
+
+    def sort_key(entry):
+        return tuple([json_order(get(entry)) for get in getters])
+
+    return sort_key
+
+
+def sort_rows(data, keys, reverse=False, top=None, buffer_rows=SORT_BUFFER_ROWS):
+    """
+    Sort a list or an iterable of entries by keys. Returns a list or an iterator.
+
+    If top is set, only the first top entries are kept in a heap, so memory use depends
+    on top and not on the number of entries. Lists are sorted in place. Other iterables
+    are sorted buffer_rows entries at a time and spilled to temporary files, which are
+    merged when there is more than one.
+    """
+    sort_key = sort_key_getter(keys)
+
+    if top is not None:
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(top, data, key=sort_key)
+
+    if isinstance(data, list):
+        data.sort(key=sort_key, reverse=reverse)
+        return data
+
+    return merge_sort_rows(iter(data), sort_key, reverse, buffer_rows)
+
+
+def merge_sort_rows(data, sort_key, reverse, buffer_rows):
+    """
+    Generator for an external merge sort. Sorted runs of buffer_rows entries are
+    written to temporary files as JSON Lines and merged one entry at a time.
+    """
+    import tempfile
+
+    runs = []
+    try:
+        while True:
+            chunk = list(itertools.islice(data, buffer_rows))
+            chunk.sort(key=sort_key, reverse=reverse)
+
+            if not runs and len(chunk) < buffer_rows:
+                # everything fits in memory
+                yield from chunk
+                return
+
+            if chunk:
+                run = tempfile.TemporaryFile('w+', encoding='utf-8')
+                runs.append(run)
+                run.writelines(json.dumps(entry) + '\n' for entry in chunk)
+                run.seek(0)
+
+            if len(chunk) < buffer_rows:
+                break
+
+        del chunk
+        yield from heapq.merge(*[map(json.loads, run) for run in runs], key=sort_key, reverse=reverse)
+
+    finally:
+        for run in runs:
+            run.close()
+
+
+def limit_rows(data, head=None, tail=None):
+    """
+    Return a list of the first head entries and/or the last tail entries of an iterable.
+    Iteration stops after head entries and only tail entries are held in memory.
+    """
+    if head is not None:
+        data = itertools.islice(data, head)
+
+    if tail is not None:
+        return list(collections.deque(data, maxlen=tail))
+
+    return list(data)
 
 
 def check_data(data=None, columns=0):
     """Return (SUCCESS, data) if data can be processed. (ERROR, msg) if not"""
+    import textwrap
+
+    if isinstance(data, RowStore):
+        # like a list, only the first row is checked
+        succeeded, result = check_data(list(itertools.islice(data, 1)), columns=columns)
+        return (SUCCESS, data) if succeeded else (ERROR, result)
+
     # only process if there is data
     if data:
         try:
@@ -195,6 +1547,13 @@ def check_data(data=None, columns=0):
     return ERROR, data
 
 
+def check_row(row, columns=0):
+    """Raise ParseError with the check_data() message if row is not a dictionary"""
+    if not isinstance(row, dict):
+        _, result = check_data([row], columns=columns)
+        raise ParseError(result)
+
+
 def get_headers(data):
     """scan the data and return a dictionary of all of the headers in order"""
     headers = []
@@ -202,11 +1561,22 @@ def get_headers(data):
     if isinstance(data, dict):
         headers.append(data.keys())
 
+    elif isinstance(data, Table):
+        headers.extend(data.headers)
+
     elif isinstance(data, list):
         for row in data:
             if isinstance(row, dict):
                 headers.extend(row.keys())
 
+    elif isinstance(data, RowStore):
+        # the rows are read from disk, so only keep the headers that are not seen yet
+        header_dict = {}
+        for row in data:
+            if isinstance(row, dict):
+                header_dict.update(dict.fromkeys(row))
+        return header_dict
+
     # preserve field order by using dict.fromkeys()
     header_dict = dict.fromkeys(headers)
 
@@ -222,11 +1592,38 @@ def make_rotate_table(
     rotate=False
 ):
     """generates a rotated table"""
-    table = ''
-    for idx, row in enumerate(data):
-        rotated_data = []
-        for k, v in row.items():
-            rotated_data.append({'key': k, 'value': v})
+    table = '\n'.join(iter_rotate_table(
+        data=data,
+        truncate=truncate,
+        nowrap=nowrap,
+        columns=columns,
+        table_format=table_format,
+        rotate=rotate
+    ))
+
+    return (SUCCESS, table)
+
+
+def iter_rotate_table(
+    data=None,
+    truncate=False,
+    nowrap=False,
+    columns=None,
+    table_format='simple',
+    rotate=False
+):
+    """
+    Generator that yields a rotated table one item at a time, so each item can be
+    printed as soon as it is formatted. Items are separated by a blank line when
+    joined with newlines.
+    """
+    data = iter(data)
+    first = list(itertools.islice(data, 2))
+    numbered = len(first) > 1
+    separator = '─' * columns
+
+    for idx, row in enumerate(itertools.chain(first, data)):
+        rotated_data = Table(['key', 'value'], list(row.items()))
 
         succeeded, result = make_table(
             data=rotated_data,
@@ -238,37 +1635,603 @@ def make_rotate_table(
         )
 
         if succeeded:
-            if len(data) > 1:
-                table += f'item: {idx}\n'
-                table += '─' * columns + '\n'
-            table += result + '\n\n'
-
-    return (SUCCESS, table[:-1])
+            if numbered:
+                yield f'item: {idx}\n{separator}\n{result}\n'
+            else:
+                yield f'{result}\n'
 
 
 def make_csv_table(data=None):
     """generate csv table"""
+    import io
+    import csv
+
     buffer = io.StringIO()
-    headers = get_headers(data)
-
-    writer = csv.DictWriter(
-        buffer,
-        headers,
-        restval='',
-        extrasaction='raise',
-        dialect='excel'
-    )
+    table = Table.from_dicts(data)
 
-    writer.writeheader()
+    writer = csv.writer(buffer, dialect='excel')
+    writer.writerow(table.headers)
+    writer.writerows(table.rows)
 
-    if isinstance(data, dict):
-        data = [data]
+    return (SUCCESS, buffer.getvalue())
 
-    if isinstance(data, list):
-        for row in data:
-            writer.writerow(row)
 
-    return (SUCCESS, buffer.getvalue())
+def write_csv_table(data=None, output=None, columns=None, fields=None):
+    """
+    Write a csv table to output (default STDOUT) one row at a time. data is a list, a
+    RowStore or an iterable of dictionaries. fields is the list of headers, if known.
+
+    Without fields, the headers of an iterable are found by reading it once and writing
+    each entry to a temporary spill file, which is then read back to write the rows.
+    Only one entry is held in memory at a time. Raises ParseError if the data is not
+    a table.
+    """
+    import csv
+    import tempfile
+
+    if output is None:
+        output = sys.stdout
+
+    writer = csv.writer(output, dialect='excel')
+
+    if isinstance(data, (list, RowStore)):
+        headers = fields or list(get_headers(data))
+        writer.writerow(headers)
+        writer.writerows(map(row.get, headers) for row in data)
+        output.write('\n')
+        return
+
+    data = iter(data)
+    first = list(itertools.islice(data, 1))
+    succeeded, result = check_data(first, columns=columns)
+    if not succeeded:
+        raise ParseError(result)
+
+    if fields is not None:
+        writer.writerow(fields)
+        for row in itertools.chain(first, data):
+            if not isinstance(row, dict):
+                succeeded, result = check_data([row], columns=columns)
+                raise ParseError(result)
+
+            writer.writerow(map(row.get, fields))
+
+        output.write('\n')
+        return
+
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as spill:
+        headers = {}
+        for row in itertools.chain(first, data):
+            if not isinstance(row, dict):
+                succeeded, result = check_data([row], columns=columns)
+                raise ParseError(result)
+
+            headers.update(dict.fromkeys(row))
+            spill.write(json.dumps(row))
+            spill.write('\n')
+
+        spill.seek(0)
+        writer.writerow(headers)
+        writer.writerows(map(json.loads(line).get, headers) for line in spill)
+
+    # match the blank line printed after make_csv_table() output
+    output.write('\n')
+
+
+def _is_number(string):
+    """True if the string is a number the way tabulate detects them"""
+    try:
+        number = float(string)
+    except (ValueError, TypeError):
+        return False
+
+    return not (math.isinf(number) or math.isnan(number)) or string.lower() in ('inf', '-inf', 'nan')
+
+
+def _cell_type(value):
+    """return the column type of a single value the way tabulate detects it"""
+    if value is None:
+        return NONE_TYPE
+
+    value_type = type(value)
+    if value_type is str:
+        if not value:
+            return NONE_TYPE
+
+        if value == 'True' or value == 'False':
+            return BOOL_TYPE
+
+        try:
+            int(value)
+            return INT_TYPE
+        except ValueError:
+            pass
+
+        thousands = THOUSANDS_NUMBER.match(value)
+        if thousands and '.' not in value:
+            return INT_TYPE
+
+        if thousands or _is_number(value):
+            return FLOAT_TYPE
+
+        return STR_TYPE
+
+    if value_type is bool:
+        return BOOL_TYPE
+
+    if value_type is int:
+        return INT_TYPE
+
+    if value_type is float:
+        return FLOAT_TYPE
+
+    return STR_TYPE
+
+
+def _format_cell(value, column_type):
+    """convert a value to a string for its column type the way tabulate does"""
+    if value is None:
+        return ''
+
+    if type(value) is str and not value:
+        return ''
+
+    if column_type == INT_TYPE:
+        return format(value, '')
+
+    if column_type == FLOAT_TYPE:
+        if type(value) is str and ',' in value:
+            value = value.replace(',', '')
+        try:
+            return format(float(value), '')
+        except (ValueError, TypeError):
+            return f'{value}'
+
+    return f'{value}'
+
+
+def _afterpoint(string):
+    """number of characters after the decimal point, -1 if there is no decimal point"""
+    if not (_is_number(string) or THOUSANDS_NUMBER.match(string)):
+        return -1
+
+    try:
+        int(string)
+        return -1
+    except ValueError:
+        pass
+
+    pos = string.rfind('.')
+    if pos < 0:
+        pos = string.lower().rfind('e')
+
+    return len(string) - pos - 1 if pos >= 0 else -1
+
+
+def render_table(table, table_format, show_headers=True, jobs=1):
+    """
+    Render a Table in one of the TABLE_STYLES formats with the same output as
+    tabulate.tabulate(), without tabulate's per-cell overhead.
+
+    Returns None if the table has to be rendered by tabulate (unsupported format,
+    ANSI codes, wide characters, or an empty table).
+    """
+    if isinstance(table.rows, RowStore) or (jobs > 1 and len(table) > PARALLEL_MIN_ROWS):
+        lines = iter_render_table(table, table_format, show_headers=show_headers, jobs=jobs)
+        if lines is None:
+            return None
+
+        return '\n'.join(lines)
+
+    # an in-memory table is one chunk, so each column is typed and measured in a
+    # single pass without the chunk pipeline. This keeps small tables (e.g. each item
+    # of a rotated table) cheap.
+    layout = _table_layout(table, table_format, show_headers)
+    if layout is None:
+        return None
+
+    style, headers, _ = layout
+    measured = _measure_rows(table.rows, keep=True)
+    if measured is None:
+        return None
+
+    column_types, multiline, ascii_only, max_decimals, head_widths, tail_widths, cache = measured
+    plan = _make_plan(headers, style, column_types, multiline, ascii_only, max_decimals, head_widths, tail_widths)
+    if plan is None:
+        return None
+
+    return '\n'.join(_render_lines(None, cache, headers, plan))
+
+
+def iter_render_table(table, table_format, show_headers=True, jobs=1):
+    """
+    Return a generator that yields the lines of a Table rendered in one of the
+    TABLE_STYLES formats. Some lines of data rows are yielded joined by newlines.
+
+    The rows are read in three passes (column types, column widths, then the lines)
+    one batch at a time, so the rows of a RowStore are never all in memory. The
+    formatted cells of an in-memory table are kept between passes. With jobs > 1,
+    large tables are split into chunks of rows that are typed, measured and
+    formatted in a pool of jobs processes. The chunks are written in their original
+    order.
+
+    Returns None if the table has to be rendered by tabulate (unsupported format,
+    ANSI codes, wide characters, or an empty table).
+    """
+    layout = _table_layout(table, table_format, show_headers)
+    if layout is None:
+        return None
+
+    style, headers, num_columns = layout
+    in_memory = not isinstance(table.rows, RowStore)
+    if in_memory:
+        def batches():
+            return [table.rows]
+    else:
+        batches = table.rows.batches
+
+    executor = None
+    if jobs > 1 and len(table) > PARALLEL_MIN_ROWS:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        chunk_rows = max(len(table) // (jobs * 4), PARALLEL_MIN_ROWS)
+
+    def map_chunks(func, *args):
+        # yield func(rows, *args) for each chunk of rows in order. Only a few chunks
+        # per process are in flight at a time to bound memory use.
+        if executor is None:
+            for batch in batches():
+                yield func(batch, *args)
+            return
+
+        pending = collections.deque()
+        for batch in batches():
+            for i in range(0, len(batch), chunk_rows):
+                pending.append(executor.submit(func, batch[i:i + chunk_rows], *args))
+                if len(pending) > jobs * 2:
+                    yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    try:
+        plan, cache = _plan_table(map_chunks, headers, style, num_columns, keep=in_memory and executor is None)
+    except BaseException:
+        if executor is not None:
+            executor.shutdown()
+        raise
+
+    if plan is None:
+        if executor is not None:
+            executor.shutdown()
+        return None
+
+    return _render_lines(map_chunks, cache, headers, plan, executor)
+
+
+def _table_layout(table, table_format, show_headers):
+    """
+    Return a tuple of (style, headers, num_columns) for rendering a Table, or None if
+    it has to be rendered by tabulate.
+    """
+    style = TABLE_STYLES.get(table_format)
+    if style is None or not len(table):
+        return None
+
+    headers = [str(k) for k in table.headers] if show_headers else []
+    if not headers and table_format != 'plain':
+        return None
+
+    num_columns = 0
+    for row in table.rows:
+        num_columns = len(row)
+        break
+
+    if not num_columns or (headers and len(headers) != num_columns):
+        return None
+
+    return style, headers, num_columns
+
+
+def _plan_table(map_chunks, headers, style, num_columns, keep=False):
+    """
+    Return a tuple of (RenderPlan, cache) for the chunks of rows from map_chunks().
+    If keep is True, cache is the list of the formatted cells and decimals of each
+    column of the last chunk. Returns (None, None) if the table has to be rendered
+    by tabulate.
+    """
+    column_types = [BOOL_TYPE] * num_columns
+    for chunk_types in map_chunks(_column_types, num_columns):
+        column_types = list(map(max, column_types, chunk_types))
+
+    multiline = False
+    ascii_only = True
+    max_decimals = [-1] * num_columns
+    head_widths = [0] * num_columns
+    tail_widths = [0] * num_columns
+    cache = None
+    for measured in map_chunks(_measure_rows, column_types, keep):
+        if measured is None:
+            return None, None
+
+        _, chunk_multiline, chunk_ascii_only, chunk_decimals, chunk_heads, chunk_tails, cache = measured
+        multiline = multiline or chunk_multiline
+        ascii_only = ascii_only and chunk_ascii_only
+        max_decimals = list(map(max, max_decimals, chunk_decimals))
+        head_widths = list(map(max, head_widths, chunk_heads))
+        tail_widths = list(map(max, tail_widths, chunk_tails))
+
+    plan = _make_plan(headers, style, column_types, multiline, ascii_only, max_decimals, head_widths, tail_widths)
+    return plan, cache if plan is not None else None
+
+
+def _make_plan(headers, style, column_types, multiline, ascii_only, max_decimals, head_widths, tail_widths):
+    """
+    Return the RenderPlan for the measurements of all the rows from _measure_rows(),
+    or None if the table has to be rendered by tabulate.
+    """
+    for header in headers:
+        if TABULATE_ONLY.search(header):
+            return None
+        multiline = multiline or '\n' in header or '\r' in header
+        ascii_only = ascii_only and header.isascii()
+
+    if multiline and not style.multiline:
+        return None
+
+    # like tabulate, measure with wcwidth if it is installed so wide characters line up
+    line_width = len if ascii_only else get_wcswidth() or len
+
+    widths = []
+    for i, column_type in enumerate(column_types):
+        # numbers are padded with spaces up to the most decimals in the column
+        width = max(head_widths[i], tail_widths[i] + (max_decimals[i] if column_type in (INT_TYPE, FLOAT_TYPE) else 0))
+        if headers:
+            min_width = max(_line_widths(headers[i], line_width)) + 2
+            if min_width < 2:
+                return None
+            width = max(width, min_width)
+        widths.append(width)
+
+    return RenderPlan(style, column_types, widths, max_decimals, multiline, ascii_only)
+
+
+def _line_widths(string, line_width):
+    """return the width of each line of string"""
+    if '\n' in string or '\r' in string:
+        return list(map(line_width, LINE_BREAK.split(string)))
+
+    return [line_width(string)]
+
+
+def _column_types(rows, num_columns):
+    """return the type of each column of a list of rows the way tabulate detects them"""
+    column_types = [BOOL_TYPE] * num_columns
+    for i, column in enumerate(zip(*rows)):
+        column_types[i] = _column_type(column)
+
+    return column_types
+
+
+def _column_type(column):
+    """return the type of the values of a column the way tabulate detects it"""
+    column_type = BOOL_TYPE
+    for value in column:
+        value_type = _cell_type(value)
+        if value_type > column_type:
+            column_type = value_type
+            if column_type == STR_TYPE:
+                break
+
+    return column_type
+
+
+def _measure_rows(rows, column_types=None, keep=False):
+    """
+    Format and measure each column of a list of rows. Returns None if the rows have
+    to be rendered by tabulate. Otherwise returns a tuple of (column_types, multiline,
+    ascii_only, max_decimals, head_widths, tail_widths, columns) where columns is the
+    list of the formatted cells and decimals of each column if keep is True. If
+    column_types is None, each column is typed as it is measured, which is only
+    right when rows are the whole table.
+
+    Numbers are padded with spaces up to the most decimals in the whole column, which
+    only lengthens the last line of a cell, so the width of the other lines and the
+    width of the last line without its decimals are measured separately.
+    """
+    if column_types is None:
+        column_types = [_column_type(column) for column in zip(*rows)]
+
+    multiline = False
+    ascii_only = True
+    max_decimals = [-1] * len(column_types)
+    head_widths = [0] * len(column_types)
+    tail_widths = [0] * len(column_types)
+    columns = [] if keep else None
+    for i, column in enumerate(zip(*rows)):
+        cells = [_format_cell(value, column_types[i]) for value in column]
+        text = ' '.join(cells)
+        if TABULATE_ONLY.search(text):
+            return None
+
+        cells, decimals = _align_cells(cells, column_types[i])
+        if keep:
+            columns.append((cells, decimals))
+
+        has_lines = '\n' in text or '\r' in text
+        multiline = multiline or has_lines
+        is_ascii = text.isascii()
+        ascii_only = ascii_only and is_ascii
+        line_width = len if is_ascii else get_wcswidth() or len
+
+        if not has_lines:
+            cell_widths = list(map(line_width, cells))
+            if min(cell_widths) < 0:
+                # wcwidth cannot measure control characters
+                return None
+            if decimals:
+                cell_widths = list(map(operator.sub, cell_widths, decimals))
+            tail_widths[i] = max(cell_widths)
+
+        else:
+            for cell, dec in zip(cells, decimals or itertools.repeat(0)):
+                cell_widths = _line_widths(cell, line_width)
+                if min(cell_widths) < 0:
+                    return None
+                if len(cell_widths) > 1:
+                    head_widths[i] = max(head_widths[i], max(cell_widths[:-1]))
+                tail_widths[i] = max(tail_widths[i], cell_widths[-1] - dec)
+
+        if decimals:
+            max_decimals[i] = max(decimals)
+
+    return column_types, multiline, ascii_only, max_decimals, head_widths, tail_widths, columns
+
+
+def _align_cells(cells, column_type):
+    """
+    Return a tuple of (cells, decimals) for the formatted cells of a column. Numbers
+    keep their padding and decimals is the number of decimals in each cell. Other
+    cells are stripped and decimals is None.
+    """
+    if column_type in (INT_TYPE, FLOAT_TYPE):
+        return cells, [_afterpoint(cell) for cell in cells]
+
+    return [cell.strip() for cell in cells], None
+
+
+def _table_builders(plan):
+    """return the pad_cell, build_line and build_row functions for a RenderPlan"""
+    style = plan.style
+    widths = plan.widths
+    multiline = plan.multiline
+    line_width = len if plan.ascii_only else get_wcswidth() or len
+
+    def pad_cell(pad, cell, width):
+        if line_width is len:
+            if multiline:
+                return '\n'.join([pad(line, width) for line in cell.splitlines()])
+            return pad(cell, width)
+
+        # pad to the visible width. tabulate pairs the lines from splitlines() with
+        # the widths of the lines split on \r and \n, so do the same.
+        if multiline:
+            lines = LINE_BREAK.split(cell)
+            visible_widths = [width - (line_width(line) - len(line)) for line in lines]
+            return '\n'.join([pad(line, w) for line, w in zip(cell.splitlines(), visible_widths)])
+        return pad(cell, width - (line_width(cell) - len(cell)))
+
+    padding = ' ' * style.padding
+    padded_widths = [width + 2 * style.padding for width in widths]
+
+    def build_line(line_format):
+        begin, fill, sep, end = line_format
+        return (begin + sep.join([fill * width for width in padded_widths]) + end).rstrip()
+
+    def build_row(cells, row_format):
+        begin, sep, end = row_format
+        if not multiline:
+            return [(begin + sep.join([padding + cell + padding for cell in cells]) + end).rstrip()]
+
+        cell_lines = [cell.splitlines() for cell in cells]
+        num_lines = max(map(len, cell_lines))
+        cell_lines = [
+            lines + [' ' * width] * (num_lines - len(lines)) for lines, width in zip(cell_lines, widths)
+        ]
+        return [
+            (begin + sep.join([padding + lines[n] + padding for lines in cell_lines]) + end).rstrip()
+            for n in range(num_lines)
+        ]
+
+    return pad_cell, build_line, build_row
+
+
+def _render_rows(rows, plan, columns=None, builders=None):
+    """
+    Return the lines of a list of data rows formatted with a RenderPlan. columns can
+    be the formatted cells and decimals of each column instead of the rows. builders
+    are the functions from _table_builders(plan) if the caller already has them.
+    """
+    pad_cell, build_line, build_row = builders or _table_builders(plan)
+
+    if columns is None:
+        columns = [
+            _align_cells([_format_cell(value, column_type) for value in column], column_type)
+            for column, column_type in zip(zip(*rows), plan.column_types)
+        ]
+
+    padded_columns = []
+    for (cells, decimals), width, max_decimals in zip(columns, plan.widths, plan.max_decimals):
+        if decimals is not None:
+            cells = [cell + (max_decimals - dec) * ' ' for cell, dec in zip(cells, decimals)]
+            pad = str.rjust
+        else:
+            pad = str.ljust
+
+        padded_columns.append([pad_cell(pad, cell, width) for cell in cells])
+
+    separator = build_line(plan.style.linebetweenrows) if plan.style.linebetweenrows else None
+    lines = []
+    for idx, row in enumerate(zip(*padded_columns)):
+        if idx and separator is not None:
+            lines.append(separator)
+        lines.extend(build_row(row, plan.style.datarow))
+
+    return lines
+
+
+def _render_chunk(rows, plan):
+    """
+    Return the lines of a list of data rows formatted with a RenderPlan, joined by
+    newlines. Returns None if there are no lines (rows of empty multiline cells).
+    """
+    lines = _render_rows(rows, plan)
+    return '\n'.join(lines) if lines else None
+
+
+def _render_lines(map_chunks, cache, headers, plan, executor=None):
+    """
+    Generator that yields the lines of a table planned by iter_render_table(). The
+    executor is shut down when the table is done.
+    """
+    try:
+        builders = _table_builders(plan)
+        _, build_line, build_row = builders
+        style = plan.style
+        line_width = len if plan.ascii_only else get_wcswidth() or len
+
+        if style.lineabove:
+            yield build_line(style.lineabove)
+
+        if headers:
+            headers = list(headers)
+            for i, width in enumerate(plan.widths):
+                pad = str.rjust if plan.column_types[i] in (INT_TYPE, FLOAT_TYPE) else str.ljust
+                if plan.multiline:
+                    headers[i] = '\n'.join([pad(line, width - (line_width(line) - len(line))) for line in MULTILINE.split(headers[i])])
+                else:
+                    headers[i] = pad(headers[i], width - (line_width(headers[i]) - len(headers[i])))
+
+            yield from build_row(headers, style.headerrow)
+            if style.linebelowheader:
+                yield build_line(style.linebelowheader)
+
+        if cache is not None:
+            yield from _render_rows(None, plan, columns=cache, builders=builders)
+        else:
+            separator = build_line(style.linebetweenrows) if style.linebetweenrows else None
+            for idx, text in enumerate(map_chunks(_render_chunk, plan)):
+                if idx and separator is not None:
+                    yield separator
+                if text is not None:
+                    yield text
+
+        if style.linebelow:
+            yield build_line(style.linebelow)
+
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
 
 def make_table(
@@ -277,23 +2240,234 @@ def make_table(
     nowrap=False,
     columns=None,
     table_format='simple',
-    rotate=False
+    rotate=False,
+    sample=None,
+    profile=NO_PROFILE,
+    jobs=1
 ):
-    """Generate simple or fancy table"""
-    if not nowrap:
-        data, table_format = wrap(
-            data=data,
-            columns=columns,
-            table_format=table_format,
-            truncate=truncate
-        )
+    """Generate simple or fancy table. With jobs > 1, large tables are rendered in a process pool"""
+    table = Table.from_dicts(data)
 
-    headers = 'keys'
+    if not nowrap:
+        with profile.stage('wrap') as stats:
+            table, table_format = wrap(
+                data=table,
+                columns=columns,
+                table_format=table_format,
+                truncate=truncate,
+                sample=sample
+            )
+            stats['rows'], stats['columns'] = len(table), len(table.headers)
+
+    headers = table.headers
     if rotate:
         table_format = 'plain'
-        headers = ''
+        headers = ()
+
+    with profile.stage('render') as stats:
+        result = render_table(table, table_format, show_headers=not rotate, jobs=jobs)
+        stats['renderer'] = 'built-in'
+        if result is None:
+            result = get_tabulate().tabulate(table.rows, headers=headers, tablefmt=table_format, floatfmt='')
+            stats['renderer'] = 'tabulate'
+        stats['rows'], stats['columns'] = len(table), len(table.headers)
+
+    return (SUCCESS, result)
+
+
+def write_table(
+    data=None,
+    output=None,
+    truncate=False,
+    nowrap=False,
+    columns=None,
+    table_format='simple',
+    sample=None,
+    profile=NO_PROFILE,
+    jobs=1
+):
+    """
+    Write a simple or fancy table to output (default STDOUT) one line at a time. data
+    can be a RowStore, so the rows and the table text are never all in memory, except
+    for tables that have to be rendered by tabulate.
+    """
+    if output is None:
+        output = sys.stdout
+
+    table = Table.from_dicts(data)
+
+    if not nowrap:
+        with profile.stage('wrap') as stats:
+            table, table_format = wrap(
+                data=table,
+                columns=columns,
+                table_format=table_format,
+                truncate=truncate,
+                sample=sample
+            )
+            stats['rows'], stats['columns'] = len(table), len(table.headers)
+
+    with profile.stage('render') as stats:
+        lines = iter_render_table(table, table_format, jobs=jobs)
+        stats['renderer'] = 'built-in'
+        if lines is None:
+            lines = [get_tabulate().tabulate(list(table.rows), headers=table.headers, tablefmt=table_format, floatfmt='')]
+            stats['renderer'] = 'tabulate'
+
+        for line in lines:
+            output.write(line)
+            output.write('\n')
+
+        stats['rows'], stats['columns'] = len(table), len(table.headers)
+
+
+def fit_widths(widths, total_width, min_width=4):
+    """
+    Return a list of column widths that fit within total_width. Columns wider than
+    the largest width that fits are capped to it. Columns are never capped below
+    min_width, which is one width for every column or a list with the minimum width
+    of each column, so the result can still be wider than total_width.
+    """
+    if sum(widths) <= total_width:
+        return list(widths)
+
+    min_widths = min_width if isinstance(min_width, list) else [min_width] * len(widths)
+
+    def capped(cap):
+        return [min(width, max(cap, min_width)) for width, min_width in zip(widths, min_widths)]
+
+    # binary search for the largest cap that fits
+    low, high = 0, max(widths)
+    while low < high:
+        cap = (low + high + 1) // 2
+        if sum(capped(cap)) <= total_width:
+            low = cap
+        else:
+            high = cap - 1
+
+    return capped(low)
+
 
-    return (SUCCESS, tabulate.tabulate(data, headers=headers, tablefmt=table_format, floatfmt=''))
+def make_stream_table(
+    data=None,
+    truncate=False,
+    nowrap=False,
+    columns=None,
+    sample_rows=STREAM_SAMPLE_ROWS
+):
+    """
+    Generator that yields a simple table one line at a time from an iterable of
+    dictionaries, so rows are printed as they arrive.
+
+    Column widths and alignment are calculated from the first sample_rows rows. Values
+    in later rows that do not fit are wrapped or truncated to the column width. Keys
+    that do not appear in the sample rows are not displayed.
+    """
+    data = iter(data)
+    sample = list(itertools.islice(data, sample_rows))
+
+    succeeded, result = check_data(sample, columns=columns)
+    if not succeeded:
+        raise ParseError(result)
+
+    if not sample:
+        return
+
+    for row in sample:
+        check_row(row, columns=columns)
+
+    headers = list(get_headers(sample))
+    if not headers:
+        # like make_table(), an empty line when the objects have no keys
+        yield ''
+        return
+
+    widths = [len(str(k)) + 2 for k in headers]
+    numeric = [True] * len(headers)
+    for row in sample:
+        for i, k in enumerate(headers):
+            v = row.get(k)
+            if v is None:
+                continue
+            widths[i] = max(widths[i], len(str(v)))
+            if isinstance(v, bool) or not isinstance(v, (int, float)):
+                numeric[i] = False
+
+    if not nowrap:
+        widths = fit_widths(widths, columns - 2 * (len(headers) - 1))
+
+    yield from format_stream_row(headers, widths, numeric, truncate, nowrap)
+    yield '  '.join('-' * width for width in widths)
+
+    for row in itertools.chain(sample, data):
+        check_row(row, columns=columns)
+        yield from format_stream_row([row.get(k) for k in headers], widths, numeric, truncate, nowrap)
+
+
+def format_stream_row(values, widths, numeric, truncate=False, nowrap=False):
+    """
+    Generator that yields the lines of one table row. Values that are wider than their
+    column are wrapped or truncated to the column width unless nowrap is True.
+    """
+    cells = []
+    for v, width in zip(values, widths):
+        v = '' if v is None else str(v)
+        if nowrap or len(v) <= width:
+            cells.append([v])
+        elif truncate:
+            cells.append([v[0:width]])
+        else:
+            cells.append([v[i:i + width] for i in range(0, len(v), width)])
+
+    for line_num in range(max((len(c) for c in cells), default=1)):
+        line = []
+        for c, width, is_numeric in zip(cells, widths, numeric):
+            v = c[line_num] if line_num < len(c) else ''
+            line.append(v.rjust(width) if is_numeric else v.ljust(width))
+        yield '  '.join(line).rstrip()
+
+
+def make_follow_table(data=None, truncate=False, nowrap=False, columns=None):
+    """
+    Generator that yields a simple table one line at a time from an iterable of
+    dictionaries that may never end (e.g. --follow). Each row is formatted on its own
+    as it arrives. Columns keep their width until a new key or a wider value arrives.
+    Then the columns are widened and the header is printed again.
+    """
+    headers = []
+    natural = []
+    numeric = []
+    widths = None
+    for row in data:
+        check_row(row, columns=columns)
+
+        for k in row:
+            if k not in headers:
+                headers.append(k)
+                natural.append(len(str(k)) + 2)
+                numeric.append(True)
+
+        if not headers:
+            # nothing to show until a row with keys arrives
+            continue
+
+        for i, k in enumerate(headers):
+            v = row.get(k)
+            if v is None:
+                continue
+            natural[i] = max(natural[i], len(str(v)))
+            if numeric[i] and (isinstance(v, bool) or not isinstance(v, (int, float))):
+                numeric[i] = False
+
+        new_widths = natural if nowrap else fit_widths(natural, columns - 2 * (len(headers) - 1))
+        if new_widths != widths:
+            if widths is not None:
+                yield ''
+            widths = list(new_widths)
+            yield from format_stream_row(headers, widths, numeric, truncate, nowrap)
+            yield '  '.join('-' * width for width in widths)
+
+        yield from format_stream_row([row.get(k) for k in headers], widths, numeric, truncate, nowrap)
 
 
 def main():
@@ -306,21 +2480,27 @@ def main():
     except AttributeError:
         pass
 
-    stdin = get_stdin()
-
     options = []
     long_options = {}
-    for arg in sys.argv:
+    filenames = []
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if not arg.startswith('-'):
+            filenames.append(arg)
+
         if arg.startswith('-') and not arg.startswith('--'):
             options.extend(arg[1:])
 
         if arg.startswith('--'):
             if '=' in arg:
                 try:
-                    k, v = arg[2:].split('=')
-                    long_options[k] = int(v)
+                    k, v = arg[2:].split('=', 1)
+                    long_options[k] = v if k in STRING_OPTIONS else int(v)
                 except Exception:
                     helptext()
+            elif arg[2:] in STRING_OPTIONS:
+                # string values can also be the next argument, e.g. --where 'a == 1'
+                long_options[arg[2:]] = next(args, None)
             else:
                 long_options[arg[2:]] = None
 
@@ -335,6 +2515,47 @@ def main():
     truncate = 't' in options or 'truncate' in long_options
     version_info = 'v' in options or 'version' in long_options
     helpme = 'h' in options or 'help' in long_options
+    stream = 'stream' in long_options
+    follow = 'follow' in long_options
+    sample = None
+    if 'sample' in long_options:
+        sample = long_options['sample'] or STREAM_SAMPLE_ROWS
+    fields = None
+    if long_options.get('fields'):
+        fields = [field.strip() for field in long_options['fields'].split(',')]
+    where = long_options.get('where')
+    sort_by = None
+    if long_options.get('sort-by'):
+        sort_by = [key.strip() for key in long_options['sort-by'].split(',')]
+    desc = 'desc' in long_options
+    top = long_options.get('top')
+    sort_buffer = long_options.get('sort-buffer') or SORT_BUFFER_ROWS
+    head = tail = None
+    if 'head' in long_options:
+        head = LIMIT_ROWS if long_options['head'] is None else long_options['head']
+    if 'tail' in long_options:
+        tail = LIMIT_ROWS if long_options['tail'] is None else long_options['tail']
+    backend = None
+    if long_options.get('json-backend'):
+        succeeded, backend = get_json_backend(long_options['json-backend'])
+        if not succeeded:
+            print_error(backend, quiet=quiet)
+    intern = None
+    if 'intern' in long_options:
+        intern = long_options['intern'] or 0
+    max_memory = None
+    if 'max-memory' in long_options:
+        max_memory = MAX_MEMORY_MB if long_options['max-memory'] is None else long_options['max-memory']
+        max_memory *= 1048576
+    jobs = 1
+    if 'jobs' in long_options:
+        jobs = long_options['jobs'] or os.cpu_count() or 1
+
+    profile = NO_PROFILE
+    if 'profile' in long_options or long_options.get('profile-file'):
+        import atexit
+        profile = Profile(enabled=True, cprofile_file=long_options.get('profile-file'))
+        atexit.register(profile.report)
 
     if markdown:
         tbl_fmt = 'github'
@@ -355,58 +2576,211 @@ def main():
         columns = long_options['cols']
 
     if columns is None:
+        import shutil
         columns = shutil.get_terminal_size().columns
 
     if version_info:
         print_error(f'jtbl:   version {__version__}\n')
 
-    if helpme:
+    if helpme or len(filenames) > 1:
         helptext()
 
-    succeeded, json_data = get_json(stdin, columns=columns)
-    if not succeeded:
-        print_error(json_data, quiet=quiet)
+    if top is not None and sort_by is None:
+        print_error('jtbl:   --top requires --sort-by\n', quiet=quiet)
 
-    succeeded, json_data = check_data(json_data, columns=columns)
-    if not succeeded:
-        print_error(json_data, quiet=quiet)
+    if where is not None:
+        succeeded, result = compile_where(where)
+        if not succeeded:
+            print_error(result, quiet=quiet)
+
+    if follow and (tail is not None or sort_by is not None or rotate or csv or markdown or dokuwiki or html or fancy_grid):
+        print_error('jtbl:   --follow can only print simple tables and cannot be used with --sort-by or --tail\n', quiet=quiet)
+
+    # the file is opened once and its magic bytes are peeked, so a named pipe such
+    # as <(cat data.json) is not read before it is parsed
+    input_binary = None
+    if filenames:
+        succeeded, input_binary = open_file(filenames[0])
+        if not succeeded:
+            print_error(input_binary, quiet=quiet)
+
+    if follow:
+        # new rows are formatted on their own as they are added, so the whole table
+        # is never wrapped or rendered again
+        succeeded, input_file = open_input(input_binary)
+        if not succeeded:
+            print_error(input_file, quiet=quiet)
+
+        rows = filter_rows(iter_json_lines(follow_lines(input_file), columns=columns, intern=intern, backend=backend), fields, where)
+
+        try:
+            for line in make_follow_table(
+                data=itertools.islice(rows, head),
+                truncate=truncate,
+                nowrap=nowrap,
+                columns=columns
+            ):
+                print(line, flush=True)
+
+        except ParseError as e:
+            print_error(str(e), quiet=quiet)
+
+        sys.exit(0)
+
+    stream_table = stream and tail is None and not (rotate or csv or markdown or dokuwiki or html or fancy_grid)
+    stream_csv = csv and not rotate and head is None and tail is None and jobs == 1
+
+    # keep the sort keys while parsing until the rows are sorted
+    parse_fields = fields
+    if fields is not None and sort_by is not None:
+        parse_fields = sort_fields(fields, sort_by)
+
+    compressed = is_compressed(input_binary)
+
+    if (stream_table or stream_csv or head is not None or tail is not None or top is not None
+            or compressed or max_memory is not None):
+        # parse one entry at a time so rows are printed as they arrive, reading stops
+        # early with --head and only the last entries are held in memory with --tail.
+        # With --top only the top entries are held while the rest are parsed.
+        # compressed data is decompressed as it is parsed. With --max-memory the rows
+        # are held in a RowStore that writes them to disk when the budget is used.
+        succeeded, input_file = open_input(input_binary)
+        if not succeeded:
+            print_error(input_file, quiet=quiet)
+
+        rows = iter_json(
+            input_file, columns=columns, fields=parse_fields, where=where, intern=intern, backend=backend
+        )
+        if sort_by is not None:
+            rows = sort_rows(rows, sort_by, reverse=desc, top=top, buffer_rows=sort_buffer)
+            if parse_fields is not fields:
+                rows = (select_fields(entry, fields) for entry in rows)
+
+        # reading, parsing and (for --stream and csv output) printing are one stage
+        with profile.stage('stream') as stats:
+            if profile.enabled:
+                rows = profile.count(rows, stats)
+
+            try:
+                if stream_table:
+                    for line in make_stream_table(
+                        data=itertools.islice(rows, head),
+                        truncate=truncate,
+                        nowrap=nowrap,
+                        columns=columns,
+                        sample_rows=sample or long_options['stream'] or STREAM_SAMPLE_ROWS
+                    ):
+                        print(line)
+
+                    sys.exit(0)
+
+                if stream_csv:
+                    # write csv rows as they are parsed so the data and the csv output
+                    # are not held in memory
+                    write_csv_table(data=rows, columns=columns, fields=fields)
+                    sys.exit(0)
+
+                if max_memory is not None and tail is None:
+                    json_data = RowStore(itertools.islice(rows, head), max_bytes=max_memory)
+                else:
+                    json_data = limit_rows(rows, head=head, tail=tail)
+
+            except ParseError as e:
+                print_error(str(e), quiet=quiet)
+
+            except Exception as e:
+                # corrupt or truncated compressed data, or text that cannot be decoded
+                print_error(f'jtbl:   Cannot read the data: {e}\n', quiet=quiet)
+
+    else:
+        with profile.stage('read') as stats:
+            if input_binary:
+                succeeded, stdin = get_file(input_binary)
+                if not succeeded:
+                    print_error(stdin, quiet=quiet)
+            else:
+                stdin = get_stdin()
+            stats['bytes'] = len(stdin or '')
+
+        with profile.stage('parse') as stats:
+            succeeded, json_data = get_json(
+                stdin, columns=columns, jobs=jobs, fields=parse_fields, where=where, intern=intern, backend=backend
+            )
+            if not succeeded:
+                print_error(json_data, quiet=quiet)
+            stats['rows'] = len(json_data)
+            if profile.enabled:
+                stats['backend'] = 'json' if intern is not None else get_json_backend(backend)[1]
+
+        if sort_by is not None:
+            with profile.stage('sort') as stats:
+                json_data = sort_rows(json_data, sort_by, reverse=desc, top=top)
+                if parse_fields is not fields:
+                    json_data = [select_fields(entry, fields) for entry in json_data]
+                stats['rows'] = len(json_data)
+
+    with profile.stage('check') as stats:
+        succeeded, json_data = check_data(json_data, columns=columns)
+        if not succeeded:
+            print_error(json_data, quiet=quiet)
+        if profile.enabled:
+            stats['rows'], stats['columns'] = len(json_data), len(get_headers(json_data))
 
     # Make and print the tables
     if rotate:
-        succeeded, result = make_rotate_table(
+        # print each item as soon as it is formatted
+        with profile.stage('rotate') as stats:
+            for idx, block in enumerate(iter_rotate_table(
+                data=json_data,
+                truncate=truncate,
+                nowrap=nowrap,
+                columns=columns,
+                rotate=True
+            )):
+                if idx:
+                    print()
+                print(block, end='')
+
+            print()
+            stats['rows'] = len(json_data)
+
+    elif csv:
+        with profile.stage('csv') as stats:
+            write_csv_table(data=json_data or [], fields=fields)
+            stats['rows'] = len(json_data)
+
+    elif isinstance(json_data, RowStore):
+        # write the table one line at a time so the table text is not held in memory
+        write_table(
             data=json_data,
             truncate=truncate,
             nowrap=nowrap,
             columns=columns,
-            rotate=True
+            table_format=tbl_fmt,
+            sample=sample,
+            profile=profile,
+            jobs=jobs
         )
 
-        if succeeded:
-            print(result)
-        else:
-            print_error(result, quiet=quiet)
-
-    elif csv:
-        succeeded, result = make_csv_table(data=json_data)
-
-        if succeeded:
-            print(result)
-        else:
-            print_error(result, quiet=quiet)
-
     else:
         succeeded, result = make_table(
             data=json_data,
             truncate=truncate,
             nowrap=nowrap,
             columns=columns,
-            table_format=tbl_fmt
+            table_format=tbl_fmt,
+            sample=sample,
+            profile=profile,
+            jobs=jobs
         )
 
-        if succeeded:
-            print(result)
-        else:
-            print_error(result, quiet=quiet)
+        with profile.stage('write') as stats:
+            if succeeded:
+                print(result)
+                sys.stdout.flush()
+            else:
+                print_error(result, quiet=quiet)
+            stats['bytes'] = len(result)
 
 
 if __name__ == '__main__':
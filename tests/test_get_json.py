@@ -1,4 +1,12 @@
+import io
+import itertools
+import os
+import sys
+import mmap
+import subprocess
+import tempfile
 import unittest
+import unittest.mock
 import textwrap
 import jtbl.cli
 
@@ -108,6 +116,456 @@ class MyTests(unittest.TestCase):
 
         self.assertEqual(jtbl.cli.get_json(stdin, columns=self.columns), (self.SUCCESS, expected))
 
+    def test_sniff_json(self):
+        """test that JSON Lines and single documents are told apart by the first line"""
+        self.assertEqual(jtbl.cli.sniff_json('{"a": 1}\n{"a": 2}\n'), 'lines')
+        self.assertEqual(jtbl.cli.sniff_json('{"a": 1}\n\n'), 'document')
+        self.assertEqual(jtbl.cli.sniff_json('{\n  "a": 1\n}\n'), 'document')
+        self.assertEqual(jtbl.cli.sniff_json('  [{"a": 1},\n{"a": 2}]', start=2), 'document')
+
+    def test_json_lines_blank_and_crlf(self):
+        """test JSON Lines with blank lines and CRLF line endings"""
+        stdin = '{"a": 1}\r\n\r\n  \n{"a": 2}\r\n'
+        expected = [{"a": 1}, {"a": 2}]
+
+        self.assertEqual(jtbl.cli.get_json(stdin, columns=self.columns), (self.SUCCESS, expected))
+
+    def test_document_error_line(self):
+        """test that errors in a single document report the line with the error"""
+        stdin = '[\n  {"a": 1},\n  {"a": }\n]'
+        expected = textwrap.dedent('''\
+        jtbl:  Exception - Expecting value: line 3 column 9 (char 22)
+               Cannot parse line 3 (Not JSON or JSON Lines data):
+                 {"a": }
+        ''')
+
+        self.assertEqual(jtbl.cli.get_json(stdin, columns=self.columns), (self.ERROR, expected))
+
+    def test_json_lines_bytes(self):
+        """test JSON Lines in a bytes-like object"""
+        stdin = b'{"name": "lo0"}\n\n{"name": "gif0"}\n'
+        expected = [{"name": "lo0"}, {"name": "gif0"}]
+
+        self.assertEqual(jtbl.cli.get_json(stdin, columns=self.columns), (self.SUCCESS, expected))
+
+    def test_get_file(self):
+        """test that files are memory-mapped and parsed"""
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'data.jsonl')
+            with open(filename, 'w') as f:
+                f.write('{"name": "lo0"}\n{"name": "gif0"}\n')
+
+            succeeded, data = jtbl.cli.get_file(filename)
+            self.assertEqual(succeeded, self.SUCCESS)
+            self.assertIsInstance(data, mmap.mmap)
+            self.assertEqual(jtbl.cli.get_json(data, columns=self.columns), (self.SUCCESS, [{"name": "lo0"}, {"name": "gif0"}]))
+            data.close()
+
+    def test_get_file_missing(self):
+        """test that a missing file returns an error"""
+        succeeded, message = jtbl.cli.get_file(os.path.join('missing', 'data.json'))
+        self.assertEqual(succeeded, self.ERROR)
+        self.assertTrue(message.startswith('jtbl:   Cannot open file:'))
+
+    def test_open_input_compressed(self):
+        """test that gzip, bz2 and xz files are decompressed as they are parsed"""
+        import gzip
+        import bz2
+        import lzma
+
+        text = b'{"name": "lo0"}\n{"name": "gif0"}\n'
+        expected = [{"name": "lo0"}, {"name": "gif0"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            for module, extension in ((gzip, 'gz'), (bz2, 'bz2'), (lzma, 'xz')):
+                filename = os.path.join(tmp, 'data.jsonl.' + extension)
+                with open(filename, 'wb') as f:
+                    f.write(module.compress(text))
+
+                self.assertTrue(jtbl.cli.is_compressed(filename))
+                succeeded, fp = jtbl.cli.open_input(filename)
+                self.assertEqual(succeeded, self.SUCCESS)
+                with fp:
+                    self.assertEqual(list(jtbl.cli.iter_json(fp, columns=self.columns)), expected)
+
+            filename = os.path.join(tmp, 'data.jsonl')
+            with open(filename, 'wb') as f:
+                f.write(text)
+            self.assertFalse(jtbl.cli.is_compressed(filename))
+
+    def test_open_input_encoding(self):
+        """test that files are decoded like json.loads() decodes bytes, not with the locale encoding"""
+        import gzip
+
+        expected = [{"name": "caf\u00e9"}]
+        with tempfile.TemporaryDirectory() as tmp:
+            for encoding, compress in (('utf-8', bytes), ('utf-8', gzip.compress), ('utf-16-le', bytes), ('utf-8-sig', bytes)):
+                filename = os.path.join(tmp, 'data.json')
+                with open(filename, 'wb') as f:
+                    f.write(compress('[{"name": "caf\u00e9"}]'.encode(encoding)))
+
+                succeeded, fp = jtbl.cli.open_input(filename)
+                self.assertEqual(succeeded, self.SUCCESS)
+                with fp:
+                    self.assertEqual(fp.encoding, encoding)
+                    self.assertEqual(list(jtbl.cli.iter_json(fp, columns=self.columns)), expected)
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'named pipes are not supported')
+    def test_read_named_pipe(self):
+        """test that a named pipe, e.g. <(cat data.jsonl), is read only once"""
+        import gzip
+
+        text = b'{"a": 1}\n{"a": 2}\n'
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'pipe')
+            for data in (text, gzip.compress(text)):
+                for options in ([], ['--head=1'], ['--stream'], ['-c']):
+                    os.mkfifo(filename)
+                    process = subprocess.Popen(
+                        [sys.executable, '-m', 'jtbl.cli', '--cols=80'] + options + [filename],
+                        stdout=subprocess.PIPE, stderr=subprocess.PIPE, cwd=root
+                    )
+                    with open(filename, 'wb') as f:
+                        f.write(data)
+                    stdout, stderr = process.communicate(timeout=60)
+                    os.remove(filename)
+
+                    self.assertEqual((process.returncode, stderr), (0, b''), options)
+                    self.assertIn(b'1', stdout)
+
+    def test_get_compression(self):
+        """test compression formats detected from magic bytes"""
+        self.assertEqual(jtbl.cli.get_compression(b'\x1f\x8b\x08\x00'), 'gzip')
+        self.assertEqual(jtbl.cli.get_compression(b'BZh91A'), 'bz2')
+        self.assertEqual(jtbl.cli.get_compression(b'\xfd7zXZ\x00'), 'xz')
+        self.assertEqual(jtbl.cli.get_compression(b'\x28\xb5\x2f\xfd\x00'), 'zstd')
+        self.assertIsNone(jtbl.cli.get_compression(b'[{"a"'))
+        self.assertIsNone(jtbl.cli.get_compression(b''))
+
+    def test_intern(self):
+        """test that interned rows share one copy of repeated keys and short values"""
+        stdin = '{"level": "INFO", "msg": "started"}\n{"level": "INFO", "msg": "stopped", "nested": {"level": 1}}\n'
+        succeeded, expected = jtbl.cli.get_json(stdin, columns=self.columns)
+        succeeded, keys_only = jtbl.cli.get_json(stdin, columns=self.columns, intern=0)
+        succeeded, result = jtbl.cli.get_json(stdin, columns=self.columns, intern=4)
+        self.assertEqual(keys_only, expected)
+        self.assertEqual(result, expected)
+
+        first, second = [list(entry) for entry in result]
+        self.assertIs(first[0], second[0])
+        self.assertIs(first[1], second[1])
+        self.assertIs(first[0], list(result[1]['nested'])[0])
+        self.assertIs(result[0]['level'], result[1]['level'])
+        self.assertIsNot(keys_only[0]['level'], keys_only[1]['level'])
+
+    def test_get_json_backend(self):
+        """test choosing a JSON backend"""
+        self.assertEqual(jtbl.cli.get_json_backend('json'), (self.SUCCESS, 'json'))
+        self.assertEqual(jtbl.cli.get_json_backend('foo'), (self.ERROR, 'jtbl:   Unknown JSON backend: foo (use one of orjson, ujson, simdjson, json)\n'))
+
+    def test_json_backend_same_result(self):
+        """test that the JSON backends other than ujson decode and report errors like the json module"""
+        stdin = '{"a": 18446744073709551616, "b": -9223372036854775809, "c": 1.5}\n{"a": "\\ud800"}\n'
+        expected = [{"a": 18446744073709551616, "b": -9223372036854775809, "c": 1.5}, {"a": "\ud800"}]
+        invalid = ['hello', '{"a": 01}', '{"a": "x\ty"}', '[1,]', '{"a": 1} x', '\ufeff{"a": 1}', '[1e400]']
+        for backend in ('orjson', 'simdjson', 'json'):
+            if jtbl.cli.get_json_backend(backend)[0]:
+                result = jtbl.cli.get_json(stdin, columns=self.columns, backend=backend)
+                self.assertEqual(result, (self.SUCCESS, expected))
+                self.assertIsInstance(result[1][0]['a'], int)
+
+                for line in invalid:
+                    json_lines = stdin + line + '\n'
+                    self.assertEqual(jtbl.cli.get_json(json_lines, columns=self.columns, backend=backend),
+                                     jtbl.cli.get_json(json_lines, columns=self.columns, backend='json'))
+                    self.assertEqual(jtbl.cli.get_json(json_lines.encode(), columns=self.columns, backend=backend),
+                                     jtbl.cli.get_json(json_lines.encode(), columns=self.columns, backend='json'))
+
+    def test_json_backend_default(self):
+        """test that simdjson and ujson, which accepts some invalid JSON, are only used when chosen"""
+        with unittest.mock.patch.dict('sys.modules', {'orjson': None}):
+            self.assertEqual(jtbl.cli.get_json_backend(), (self.SUCCESS, 'json'))
+
+    def test_has_big_number(self):
+        """test finding integers that may not fit in 64 bits"""
+        self.assertTrue(jtbl.cli.has_big_number('{"a": 18446744073709551616}'))
+        self.assertTrue(jtbl.cli.has_big_number(b'[1234567890123456789]'))
+        self.assertFalse(jtbl.cli.has_big_number('{"a": 123456789012345678, "b": "١٢٣"}'))
+
+    def test_follow_lines(self):
+        """test that partial lines are joined and a stream that is not a file ends at EOF"""
+        fp = io.StringIO('{"a": 1}\n{"a": 2}')
+        self.assertEqual(list(jtbl.cli.follow_lines(fp)), ['{"a": 1}\n', '{"a": 2}'])
+
+    def test_follow_lines_compressed(self):
+        """test that a compressed file is read once and is not polled like a regular file"""
+        import gzip
+
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'data.jsonl.gz')
+            with gzip.open(filename, 'wt') as f:
+                f.write('{"a": 1}\n' * 50)
+
+            succeeded, fp = jtbl.cli.open_input(filename)
+            with fp:
+                lines = list(itertools.islice(jtbl.cli.follow_lines(fp, max_interval=0.01), 100))
+
+        self.assertEqual(lines, ['{"a": 1}\n'] * 50)
+
+    def test_json_lines_parallel(self):
+        """test that JSON Lines parsed in a process pool are merged in order"""
+        stdin = ''.join(f'{{"id": {i}}}\n' for i in range(500))
+        expected = [{"id": i} for i in range(500)]
+
+        with unittest.mock.patch.object(jtbl.cli, 'PARALLEL_MIN_CHUNK', 100):
+            self.assertEqual(jtbl.cli.get_json(stdin, columns=self.columns, jobs=2), (self.SUCCESS, expected))
+
+    def test_json_lines_parallel_error(self):
+        """test that errors in a process pool report the line number in the whole input"""
+        stdin = ''.join(f'{{"id": {i}}}\n' for i in range(300)) + 'hello\n' + '{"id": 0}\n' * 10
+        expected = textwrap.dedent('''\
+        jtbl:  Exception - Expecting value: line 1 column 1 (char 0)
+               Cannot parse line 301 (Not JSON or JSON Lines data):
+               hello
+        ''')
+
+        with unittest.mock.patch.object(jtbl.cli, 'PARALLEL_MIN_CHUNK', 100):
+            self.assertEqual(jtbl.cli.get_json(stdin, columns=self.columns, jobs=2), (self.ERROR, expected))
+
+    def test_iter_json_lines(self):
+        """test JSON Lines data from an iterable of lines"""
+        stdin = ['{"name":"lo0","type":null}\n', '\n', '{"name":"gif0","type":"loopback"}\n']
+        expected = [
+            {"name": "lo0", "type": None},
+            {"name": "gif0", "type": "loopback"}
+        ]
+
+        self.assertEqual(list(jtbl.cli.iter_json_lines(stdin, columns=self.columns)), expected)
+
+    def test_iter_json_lines_error(self):
+        """test that the line number of a bad line is reported"""
+        stdin = ['{"name":"lo0"}\n', 'hello\n']
+        expected = textwrap.dedent('''\
+        jtbl:  Exception - Expecting value: line 1 column 1 (char 0)
+               Cannot parse line 2 (Not JSON or JSON Lines data):
+               hello
+        ''')
+
+        with self.assertRaises(jtbl.cli.ParseError) as context:
+            list(jtbl.cli.iter_json_lines(stdin, columns=self.columns))
+
+        self.assertEqual(str(context.exception), expected)
+
+    def test_iter_json_array(self):
+        """test that a JSON array is decoded one element at a time across small chunks"""
+        stdin = io.StringIO('[\n  {"name": "lo0", "mtu": 16384},\n  {"name": "gif0", "mtu": 1280, "flags": [1, 2]}\n]\n')
+        expected = [
+            {"name": "lo0", "mtu": 16384},
+            {"name": "gif0", "mtu": 1280, "flags": [1, 2]}
+        ]
+
+        self.assertEqual(list(jtbl.cli.iter_json(stdin, columns=self.columns, chunk_size=3)), expected)
+
+    def test_iter_json_array_error(self):
+        """test that errors in a JSON array report the line of the source"""
+        stdin = io.StringIO('[\n{"a": 1},\n{"a": }\n]')
+        expected = textwrap.dedent('''\
+        jtbl:  Exception - Expecting value: line 3 column 7 (char 18)
+               Cannot parse line 3 (Not JSON or JSON Lines data):
+               {"a": }
+        ''')
+
+        with self.assertRaises(jtbl.cli.ParseError) as context:
+            list(jtbl.cli.iter_json(stdin, columns=self.columns, chunk_size=4))
+
+        self.assertEqual(str(context.exception), expected)
+
+    def test_iter_json_array_split_values(self):
+        """test numbers, literals and escapes that are cut off at every chunk boundary"""
+        stdin = '[1.5, 2e+10, -Infinity, "\\ud83d\\ude00", true, {"k": [0.25, null]}]'
+        expected = [1.5, 2e+10, float('-inf'), '\U0001f600', True, {"k": [0.25, None]}]
+
+        for chunk_size in range(1, len(stdin) + 1):
+            self.assertEqual(list(jtbl.cli.iter_json(io.StringIO(stdin), columns=self.columns, chunk_size=chunk_size)), expected)
+
+    def test_iter_json_array_early_error(self):
+        """test that an invalid element is reported without reading the rest of the array"""
+        stdin = io.StringIO('[{"a": }, ' + ', '.join(['{"a": 1}'] * 10000) + ']')
+
+        with self.assertRaises(jtbl.cli.ParseError):
+            list(jtbl.cli.iter_json(stdin, columns=self.columns, chunk_size=64))
+
+        self.assertLess(stdin.tell(), 1024)
+
+    def test_iter_json_no_data(self):
+        """test that empty or whitespace-only input is reported like get_json()"""
+        expected = textwrap.dedent('''\
+        jtbl:   Missing piped data
+        ''')
+
+        for stdin in ('', ' \n\n'):
+            with self.assertRaises(jtbl.cli.ParseError) as context:
+                list(jtbl.cli.iter_json(io.StringIO(stdin), columns=self.columns, fields=['a'], chunk_size=1))
+
+            self.assertEqual(str(context.exception), expected)
+
+    def test_iter_json_json_lines(self):
+        """test that JSON Lines are detected when the first chunk ends mid-line"""
+        stdin = io.StringIO('\n{"name": "lo0"}\n{"name": "gif0"}\n')
+        expected = [{"name": "lo0"}, {"name": "gif0"}]
+
+        self.assertEqual(list(jtbl.cli.iter_json(stdin, columns=self.columns, chunk_size=5)), expected)
+
+
+    def test_iter_json_document(self):
+        """test that a single JSON object that spans more than one line is yielded"""
+        stdin = io.StringIO('{\n  "name": "lo0",\n  "mtu": 16384\n}\n')
+        expected = [{"name": "lo0", "mtu": 16384}]
+
+        self.assertEqual(list(jtbl.cli.iter_json(stdin, columns=self.columns, chunk_size=5)), expected)
+
+    def test_limit_rows(self):
+        """test the first and last rows of a stream"""
+        stdin = io.StringIO('{"a": 1}\n{"a": 2}\n{"a": 3}\n')
+        self.assertEqual(jtbl.cli.limit_rows(jtbl.cli.iter_json(stdin), head=2), [{"a": 1}, {"a": 2}])
+        self.assertEqual(jtbl.cli.limit_rows(range(5), tail=2), [3, 4])
+        self.assertEqual(jtbl.cli.limit_rows(range(5), head=3, tail=2), [1, 2])
+
+    def test_limit_rows_head_stops_reading(self):
+        """test that --head stops parsing once enough rows are read"""
+        stdin = io.StringIO('[{"a": 1}, {"a": 2}, not json')
+        self.assertEqual(jtbl.cli.limit_rows(jtbl.cli.iter_json(stdin, chunk_size=4), head=2), [{"a": 1}, {"a": 2}])
+
+
+    def test_fields(self):
+        """test that only the selected fields are kept, in the order given"""
+        expected = [{"c": 3, "a": 1}, {"c": None, "a": 4}]
+        json_lines = '{"a": 1, "b": 2, "c": 3}\n{"a": 4, "b": {"c": 5}}\n'
+        document = '[{"a": 1, "b": 2, "c": 3}, {"a": 4, "b": {"c": 5}}]'
+
+        self.assertEqual(jtbl.cli.get_json(json_lines, columns=self.columns, fields=['c', 'a']), (self.SUCCESS, expected))
+        self.assertEqual(jtbl.cli.get_json(document, columns=self.columns, fields=['c', 'a']), (self.SUCCESS, expected))
+        self.assertEqual(list(jtbl.cli.iter_json(io.StringIO(json_lines), fields=['c', 'a'])), expected)
+        self.assertEqual(list(jtbl.cli.iter_json(io.StringIO(document), fields=['c', 'a'])), expected)
+
+    def test_fields_document_elements(self):
+        """test that a JSON array is selected one element at a time, not decoded at once"""
+        document = '[{"a": 1, "b": 2},\r\n {"a": 4, "b": 5}]'
+        expected = textwrap.dedent('''\
+        jtbl:  Exception - Extra data: line 2 column 20 (char 39)
+               Cannot parse line 2 (Not JSON or JSON Lines data):
+                {"a": 4, "b": 5}] x
+        ''')
+
+        with unittest.mock.patch.object(jtbl.cli, 'make_loads', side_effect=AssertionError):
+            for data in (document, document.encode(), b'\xef\xbb\xbf' + document.encode(), document.encode('utf-16-le')):
+                self.assertEqual(jtbl.cli.get_json(data, columns=self.columns, fields=['b']), (self.SUCCESS, [{"b": 2}, {"b": 5}]))
+                self.assertEqual(jtbl.cli.get_json(data, columns=self.columns, where='a > 1'), (self.SUCCESS, [{"a": 4, "b": 5}]))
+
+            self.assertEqual(jtbl.cli.get_json(document + ' x', columns=self.columns, fields=['b']), (self.ERROR, expected))
+
+
+    def test_compile_where(self):
+        """test --where expressions"""
+        rows = [
+            {"status": 500, "host": "a", "up": True, "net": {"mtu": 1500}},
+            {"status": 200, "host": "b", "up": 1, "net": None},
+            {"status": "n/a", "host": "a", "up": False}
+        ]
+        tests = [
+            ('status>=500 and host=="a"', [0]),
+            ("host == 'b' or net.mtu < 9000", [0, 1]),
+            ('not (status >= 500)', [1, 2]),
+            ('up', [0, 1]),
+            ('up == true', [0]),
+            ('status != 200', [0, 2]),
+            ('net == null', [1, 2])
+        ]
+        for expression, expected in tests:
+            succeeded, keep = jtbl.cli.compile_where(expression)
+            self.assertTrue(succeeded, expression)
+            self.assertEqual([i for i, row in enumerate(rows) if keep(row)], expected, expression)
+
+    def test_compile_where_error(self):
+        """test invalid --where expressions"""
+        for expression in ('status >=', 'status = 1', '(status > 1', 'status > 1 host'):
+            self.assertEqual(jtbl.cli.compile_where(expression)[0], self.ERROR, expression)
+
+    def test_where(self):
+        """test that entries are filtered before fields are selected"""
+        expected = [{"a": 4}]
+        json_lines = '{"a": 1, "b": 2}\n{"a": 4, "b": 5}\n'
+        document = '[{"a": 1, "b": 2}, {"a": 4, "b": 5}]'
+
+        self.assertEqual(jtbl.cli.get_json(json_lines, columns=self.columns, fields=['a'], where='b > 2'), (self.SUCCESS, expected))
+        self.assertEqual(jtbl.cli.get_json(document, columns=self.columns, fields=['a'], where='b > 2'), (self.SUCCESS, expected))
+        self.assertEqual(list(jtbl.cli.iter_json(io.StringIO(json_lines), fields=['a'], where='b > 2')), expected)
+
+
+    def test_sort_rows(self):
+        """test sorting by more than one key with values of different types"""
+        rows = [{"a": "x", "b": 1}, {"a": 2, "b": 2}, {"b": 3}, {"a": 2, "b": 1}, {"a": True, "b": 4}]
+        expected = [{"b": 3}, {"a": True, "b": 4}, {"a": 2, "b": 1}, {"a": 2, "b": 2}, {"a": "x", "b": 1}]
+
+        self.assertEqual(jtbl.cli.sort_rows(list(rows), ['a', 'b']), expected)
+        self.assertEqual(list(jtbl.cli.sort_rows(iter(rows), ['a', 'b'], buffer_rows=2)), expected)
+        self.assertEqual(list(jtbl.cli.sort_rows(iter(rows), ['a', 'b'], reverse=True, buffer_rows=2)), expected[::-1])
+        self.assertEqual(jtbl.cli.sort_rows(iter(rows), ['a', 'b'], top=2), expected[:2])
+        self.assertEqual(jtbl.cli.sort_rows(iter(rows), ['a', 'b'], reverse=True, top=2), expected[:2:-1])
+
+    def test_sort_rows_fields(self):
+        """test sorting by top-level and nested keys that are not in --fields"""
+        rows = [{"id": 1, "a": 2, "n": {"x": 3}}, {"id": 2, "a": 1, "n": {"x": 1}}, {"id": 3, "a": 3, "n": {"x": 2}}]
+
+        for sort_by, expected in ((['n.x'], [2, 3, 1]), (['a'], [2, 1, 3])):
+            parse_fields = jtbl.cli.sort_fields(['id'], sort_by)
+            parsed = [jtbl.cli.select_fields(row, parse_fields) for row in rows]
+            result = [jtbl.cli.select_fields(row, ['id']) for row in jtbl.cli.sort_rows(parsed, sort_by)]
+            self.assertEqual(result, [{"id": i} for i in expected])
+
+    def test_top_streams_input(self):
+        """test that --top parses the file one entry at a time instead of reading it all"""
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'data.jsonl')
+            with open(filename, 'w') as f:
+                f.write('{"v": 3}\n{"v": 1}\n{"v": 2}\n')
+
+            argv = ['jtbl', '--sort-by=v', '--top=2', '--cols=80', filename]
+            with unittest.mock.patch.object(sys, 'argv', argv), \
+                    unittest.mock.patch.object(jtbl.cli, 'get_file', side_effect=AssertionError), \
+                    unittest.mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                jtbl.cli.main()
+
+        self.assertEqual(stdout.getvalue(), '  v\n---\n  1\n  2\n')
+
+    def test_zero_options(self):
+        """test that --head=0 and --tail=0 display no rows and --max-memory=0 keeps no rows in memory"""
+        init = jtbl.cli.RowStore.__init__
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'data.jsonl')
+            with open(filename, 'w') as f:
+                f.write('{"v": 1}\n{"v": 2}\n')
+
+            for option, expected in (('--head=0', '\n'), ('--tail=0', '\n'), ('--max-memory=0', '  v\n---\n  1\n  2\n')):
+                argv = ['jtbl', option, '--cols=80', filename]
+                with unittest.mock.patch.object(sys, 'argv', argv), \
+                        unittest.mock.patch.object(jtbl.cli.RowStore, '__init__', autospec=True, side_effect=init) as row_store, \
+                        unittest.mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+                    jtbl.cli.main()
+
+                self.assertEqual(stdout.getvalue(), expected)
+                if option == '--max-memory=0':
+                    self.assertEqual(row_store.call_args[1]['max_bytes'], 0)
+
+    def test_sort_rows_stable(self):
+        """test that entries with the same key keep their order when spilled to files"""
+        rows = [{"key": i % 3, "order": i} for i in range(20)]
+        expected = sorted(rows, key=lambda row: row["key"])
+        expected_desc = sorted(rows, key=lambda row: row["key"], reverse=True)
+
+        self.assertEqual(list(jtbl.cli.sort_rows(iter(rows), ['key'], buffer_rows=3)), expected)
+        self.assertEqual(list(jtbl.cli.sort_rows(iter(rows), ['key'], reverse=True, buffer_rows=3)), expected_desc)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,4 +1,9 @@
+import io
+import os
+import sys
+import subprocess
 import unittest
+import unittest.mock
 import textwrap
 import jtbl.cli
 
@@ -58,252 +63,206 @@ class MyTests(unittest.TestCase):
     def test_jc_dig(self):
         stdin = [{"id": 55658, "opcode": "QUERY", "status": "NOERROR", "flags": ["qr", "rd", "ra"], "query_num": 1, "answer_num": 5, "authority_num": 0, "additional_num": 1, "question": {"name": "www.cnn.com.", "class": "IN", "type": "A"}, "answer": [{"name": "www.cnn.com.", "class": "IN", "type": "CNAME", "ttl": 147, "data": "turner-tls.map.fastly.net."}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.1.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.65.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.129.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.193.67"}], "query_time": 44, "server": "2600", "when": "Wed Mar 18 12:20:59 PDT 2020", "rcvd": 143}]
         expected = textwrap.dedent('''\
-        ╒══════╤════════╤════════╤════════╤════════╤════════╤════════╤════════╤════════╤════════╤════════╤════════╤════════╤════════╕
-        │ id   │ opco   │ stat   │ flag   │   quer │   answ │   auth │   addi │ ques   │ answ   │   quer │   serv │ when   │   rcvd │
-        │      │ de     │ us     │ s      │   y_nu │   er_n │   orit │   tion │ tion   │ er     │   y_ti │     er │        │        │
-        │      │        │        │        │      m │     um │   y_nu │   al_n │        │        │     me │        │        │        │
-        │      │        │        │        │        │        │      m │     um │        │        │        │        │        │        │
-        ╞══════╪════════╪════════╪════════╪════════╪════════╪════════╪════════╪════════╪════════╪════════╪════════╪════════╪════════╡
-        │ 5565 │ QUER   │ NOER   │ ['qr   │      1 │      5 │      0 │      1 │ {'na   │ [{'n   │     44 │   2600 │ Wed    │    143 │
-        │ 8    │ Y      │ ROR    │ ', '   │        │        │        │        │ me':   │ ame'   │        │        │ Mar    │        │
-        │      │        │        │ rd',   │        │        │        │        │  'ww   │ : 'w   │        │        │ 18 1   │        │
-        │      │        │        │  'ra   │        │        │        │        │ w.cn   │ ww.c   │        │        │ 2:20   │        │
-        │      │        │        │ ']     │        │        │        │        │ n.co   │ nn.c   │        │        │ :59    │        │
-        │      │        │        │        │        │        │        │        │ m.',   │ om.'   │        │        │ PDT    │        │
-        │      │        │        │        │        │        │        │        │  'cl   │ , 'c   │        │        │ 2020   │        │
-        │      │        │        │        │        │        │        │        │ ass'   │ lass   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │ : 'I   │ ': '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │ N',    │ IN',   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │ 'typ   │  'ty   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │ e':    │ pe':   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │ 'A'}   │  'CN   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ AME'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ , 't   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ tl':   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  147   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ , 'd   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ata'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ : 't   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ urne   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ r-tl   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ s.ma   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ p.fa   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ stly   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ .net   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ .'},   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  {'n   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ame'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ : 't   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ urne   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ r-tl   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ s.ma   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ p.fa   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ stly   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ .net   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ .',    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'cla   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ss':   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  'IN   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ', '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ type   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ': '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ A',    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'ttl   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ': 5   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ , 'd   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ata'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ : '1   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 51.1   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 01.1   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ .67'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ }, {   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'nam   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ e':    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'tur   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ner-   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ tls.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ map.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ fast   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ly.n   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ et.'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ , 'c   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ lass   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ': '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ IN',   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  'ty   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ pe':   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  'A'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ , 't   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ tl':   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  5,    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'dat   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ a':    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ '151   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ .101   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ .65.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 67'}   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ , {'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ name   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ': '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ turn   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ er-t   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ls.m   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ap.f   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ astl   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ y.ne   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ t.',   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  'cl   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ass'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ : 'I   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ N',    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'typ   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ e':    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'A',   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  'tt   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ l':    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 5, '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ data   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ': '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 151.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 101.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 129.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 67'}   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ , {'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ name   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ': '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ turn   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ er-t   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ls.m   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ap.f   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ astl   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ y.ne   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ t.',   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  'cl   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ass'   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ : 'I   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ N',    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'typ   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ e':    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 'A',   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │  'tt   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ l':    │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 5, '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ data   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ': '   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 151.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 101.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 193.   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ 67'}   │        │        │        │        │
-        │      │        │        │        │        │        │        │        │        │ ]      │        │        │        │        │
-        ╘══════╧════════╧════════╧════════╧════════╧════════╧════════╧════════╧════════╧════════╧════════╧════════╧════════╧════════╛''')
+        ╒═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╤═══════╕
+        │    id │ opc   │ sta   │ fla   │   que │   ans │   aut │   add │ que   │ ans   │   que │   ser │ whe   │   rcv │
+        │       │ ode   │ tus   │ gs    │   ry_ │   wer │   hor │   iti │ sti   │ wer   │   ry_ │   ver │ n     │     d │
+        │       │       │       │       │   num │   _nu │   ity │   ona │ on    │       │   tim │       │       │       │
+        │       │       │       │       │       │     m │   _nu │   l_n │       │       │     e │       │       │       │
+        │       │       │       │       │       │       │     m │    um │       │       │       │       │       │       │
+        ╞═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╪═══════╡
+        │ 55658 │ QUERY │ NOERR │ ['qr' │     1 │     5 │     0 │     1 │ {'nam │ [{'na │    44 │  2600 │ Wed M │   143 │
+        │       │       │ OR    │ , 'rd │       │       │       │       │ e': ' │ me':  │       │       │ ar 18 │       │
+        │       │       │       │ ', 'r │       │       │       │       │ www.c │ 'www. │       │       │  12:2 │       │
+        │       │       │       │ a']   │       │       │       │       │ nn.co │ cnn.c │       │       │ 0:59  │       │
+        │       │       │       │       │       │       │       │       │ m.',  │ om.', │       │       │ PDT 2 │       │
+        │       │       │       │       │       │       │       │       │ 'clas │  'cla │       │       │ 020   │       │
+        │       │       │       │       │       │       │       │       │ s': ' │ ss':  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │ IN',  │ 'IN', │       │       │       │       │
+        │       │       │       │       │       │       │       │       │ 'type │  'typ │       │       │       │       │
+        │       │       │       │       │       │       │       │       │ ': 'A │ e': ' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │ '}    │ CNAME │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ', 't │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ tl':  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 147,  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'data │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ': 't │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ urner │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ -tls. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ map.f │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ astly │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ .net. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ '}, { │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'name │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ': 't │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ urner │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ -tls. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ map.f │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ astly │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ .net. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ', 'c │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ lass' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ : 'IN │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ', 't │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ype': │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  'A', │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  'ttl │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ': 5, │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  'dat │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ a': ' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 151.1 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 01.1. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 67'}, │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  {'na │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ me':  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'turn │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ er-tl │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ s.map │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ .fast │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ly.ne │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ t.',  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'clas │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ s': ' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ IN',  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'type │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ': 'A │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ', 't │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ tl':  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 5, 'd │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ata': │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  '151 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ .101. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 65.67 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ '}, { │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'name │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ': 't │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ urner │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ -tls. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ map.f │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ astly │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ .net. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ', 'c │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ lass' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ : 'IN │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ', 't │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ype': │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  'A', │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  'ttl │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ': 5, │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  'dat │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ a': ' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 151.1 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 01.12 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 9.67' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ }, {' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ name' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ : 'tu │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ rner- │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ tls.m │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ap.fa │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ stly. │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ net.' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ , 'cl │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ass': │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │  'IN' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ , 'ty │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ pe':  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'A',  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'ttl' │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ : 5,  │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 'data │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ': '1 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 51.10 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ 1.193 │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ .67'} │       │       │       │       │
+        │       │       │       │       │       │       │       │       │       │ ]     │       │       │       │       │
+        ╘═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╧═══════╛''')
 
         self.assertEqual(jtbl.cli.make_table(data=stdin, columns=80), (self.SUCCESS, expected))
 
     def test_jc_dig_150cols(self):
         stdin = [{"id": 55658, "opcode": "QUERY", "status": "NOERROR", "flags": ["qr", "rd", "ra"], "query_num": 1, "answer_num": 5, "authority_num": 0, "additional_num": 1, "question": {"name": "www.cnn.com.", "class": "IN", "type": "A"}, "answer": [{"name": "www.cnn.com.", "class": "IN", "type": "CNAME", "ttl": 147, "data": "turner-tls.map.fastly.net."}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.1.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.65.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.129.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.193.67"}], "query_time": 44, "server": "2600", "when": "Wed Mar 18 12:20:59 PDT 2020", "rcvd": 143}]
         expected = textwrap.dedent('''\
-        ╒═══════╤══════════╤══════════╤═════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤════════╤════════╕
-        │    id │ opcode   │ status   │ flags   │   query_ │   answer │   author │   additi │ questi   │ answer   │   query_ │   server │ when   │   rcvd │
-        │       │          │          │         │      num │     _num │   ity_nu │   onal_n │ on       │          │     time │          │        │        │
-        │       │          │          │         │          │          │        m │       um │          │          │          │          │        │        │
-        ╞═══════╪══════════╪══════════╪═════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪════════╪════════╡
-        │ 55658 │ QUERY    │ NOERRO   │ ['qr',  │        1 │        5 │        0 │        1 │ {'name   │ [{'nam   │       44 │     2600 │ Wed Ma │    143 │
-        │       │          │ R        │  'rd',  │          │          │          │          │ ': 'ww   │ e': 'w   │          │          │ r 18 1 │        │
-        │       │          │          │  'ra']  │          │          │          │          │ w.cnn.   │ ww.cnn   │          │          │ 2:20:5 │        │
-        │       │          │          │         │          │          │          │          │ com.',   │ .com.'   │          │          │ 9 PDT  │        │
-        │       │          │          │         │          │          │          │          │  'clas   │ , 'cla   │          │          │ 2020   │        │
-        │       │          │          │         │          │          │          │          │ s': 'I   │ ss': '   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │ N', 't   │ IN', '   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │ ype':    │ type':   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │ 'A'}     │  'CNAM   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ E', 't   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ tl': 1   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 47, 'd   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ata':    │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 'turne   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ r-tls.   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ map.fa   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ stly.n   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ et.'},   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  {'nam   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ e': 't   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ urner-   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ tls.ma   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ p.fast   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ly.net   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ .', 'c   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ lass':   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  'IN',   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  'type   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ': 'A'   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ , 'ttl   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ': 5,    │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 'data'   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ : '151   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ .101.1   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ .67'},   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  {'nam   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ e': 't   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ urner-   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ tls.ma   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ p.fast   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ly.net   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ .', 'c   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ lass':   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  'IN',   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  'type   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ': 'A'   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ , 'ttl   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ': 5,    │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 'data'   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ : '151   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ .101.6   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 5.67'}   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ , {'na   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ me': '   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ turner   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ -tls.m   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ap.fas   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ tly.ne   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ t.', '   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ class'   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ : 'IN'   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ , 'typ   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ e': 'A   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ', 'tt   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ l': 5,   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  'data   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ': '15   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 1.101.   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 129.67   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ '}, {'   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ name':   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  'turn   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ er-tls   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ .map.f   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ astly.   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ net.',   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │  'clas   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ s': 'I   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ N', 't   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ype':    │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 'A', '   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ttl':    │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 5, 'da   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ ta': '   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 151.10   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 1.193.   │          │          │        │        │
-        │       │          │          │         │          │          │          │          │          │ 67'}]    │          │          │        │        │
-        ╘═══════╧══════════╧══════════╧═════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧════════╧════════╛''')
+        ╒═══════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤══════════╤════════╕
+        │    id │ opcode   │ status   │ flags    │   query_ │   answer │   author │   additi │ questi   │ answer   │   query_ │   server │ when     │   rcvd │
+        │       │          │          │          │      num │     _num │   ity_nu │   onal_n │ on       │          │     time │          │          │        │
+        │       │          │          │          │          │          │        m │       um │          │          │          │          │          │        │
+        ╞═══════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪══════════╪════════╡
+        │ 55658 │ QUERY    │ NOERROR  │ ['qr', ' │        1 │        5 │        0 │        1 │ {'name': │ [{'name' │       44 │     2600 │ Wed Mar  │    143 │
+        │       │          │          │ rd', 'ra │          │          │          │          │  'www.cn │ : 'www.c │          │          │ 18 12:20 │        │
+        │       │          │          │ ']       │          │          │          │          │ n.com.', │ nn.com.' │          │          │ :59 PDT  │        │
+        │       │          │          │          │          │          │          │          │  'class' │ , 'class │          │          │ 2020     │        │
+        │       │          │          │          │          │          │          │          │ : 'IN',  │ ': 'IN', │          │          │          │        │
+        │       │          │          │          │          │          │          │          │ 'type':  │  'type': │          │          │          │        │
+        │       │          │          │          │          │          │          │          │ 'A'}     │  'CNAME' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ , 'ttl': │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │  147, 'd │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ata': 't │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ urner-tl │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ s.map.fa │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ stly.net │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ .'}, {'n │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ame': 't │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ urner-tl │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ s.map.fa │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ stly.net │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ .', 'cla │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ss': 'IN │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ', 'type │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ': 'A',  │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 'ttl': 5 │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ , 'data' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ : '151.1 │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 01.1.67' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ }, {'nam │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ e': 'tur │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ner-tls. │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ map.fast │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ly.net.' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ , 'class │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ': 'IN', │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │  'type': │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │  'A', 't │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ tl': 5,  │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 'data':  │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ '151.101 │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ .65.67'} │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ , {'name │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ': 'turn │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ er-tls.m │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ap.fastl │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ y.net.', │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │  'class' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ : 'IN',  │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 'type':  │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 'A', 'tt │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ l': 5, ' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ data': ' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 151.101. │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 129.67'} │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ , {'name │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ': 'turn │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ er-tls.m │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ap.fastl │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ y.net.', │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │  'class' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ : 'IN',  │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 'type':  │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 'A', 'tt │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ l': 5, ' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ data': ' │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 151.101. │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ 193.67'} │          │          │          │        │
+        │       │          │          │          │          │          │          │          │          │ ]        │          │          │          │        │
+        ╘═══════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧══════════╧════════╛''')
 
         self.assertEqual(jtbl.cli.make_table(data=stdin, columns=150), (self.SUCCESS, expected))
 
     def test_jc_dig_150cols_t(self):
         stdin = [{"id": 55658, "opcode": "QUERY", "status": "NOERROR", "flags": ["qr", "rd", "ra"], "query_num": 1, "answer_num": 5, "authority_num": 0, "additional_num": 1, "question": {"name": "www.cnn.com.", "class": "IN", "type": "A"}, "answer": [{"name": "www.cnn.com.", "class": "IN", "type": "CNAME", "ttl": 147, "data": "turner-tls.map.fastly.net."}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.1.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.65.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.129.67"}, {"name": "turner-tls.map.fastly.net.", "class": "IN", "type": "A", "ttl": 5, "data": "151.101.193.67"}], "query_time": 44, "server": "2600", "when": "Wed Mar 18 12:20:59 PDT 2020", "rcvd": 143}]
         expected = textwrap.dedent('''\
-           id  opcode    status    flags       query_nu    answer_n    authorit    addition  question    answer      query_ti    server  when       rcvd
-        -----  --------  --------  --------  ----------  ----------  ----------  ----------  ----------  --------  ----------  --------  -------  ------
-        55658  QUERY     NOERROR   ['qr', '           1           5           0           1  {'name':    [{'name'          44      2600  Wed Mar     143''')
+           id  opcode    status    flags         query_nu    answer_n    authorit    addition  question    answer       query_ti    server  when         rcvd
+        -----  --------  --------  ----------  ----------  ----------  ----------  ----------  ----------  ---------  ----------  --------  ---------  ------
+        55658  QUERY     NOERROR   ['qr', 'rd           1           5           0           1  {'name': '  [{'name':          44      2600  Wed Mar 1     143''')
 
         self.assertEqual(jtbl.cli.make_table(data=stdin, truncate=True, columns=150), (self.SUCCESS, expected))
 
@@ -461,16 +420,15 @@ class MyTests(unittest.TestCase):
         │ foo this is a very long long   │ bar this is another very lon   │ baz is yet another long key    │
         │  key                           │ g string                       │ name                           │
         ╞════════════════════════════════╪════════════════════════════════╪════════════════════════════════╡
-        │ this is a very very long str   │                                │                                │
-        │ ing yes it is                  │                                │                                │
+        │ this is a very very long strin │                                │                                │
+        │ g yes it is                    │                                │                                │
         ├────────────────────────────────┼────────────────────────────────┼────────────────────────────────┤
-        │ medium length string           │ now is the time for all good   │                                │
-        │                                │  men to come to the aide of    │                                │
-        │                                │ their party                    │                                │
+        │ medium length string           │ now is the time for all good m │                                │
+        │                                │ en to come to the aide of thei │                                │
+        │                                │ r party                        │                                │
         ├────────────────────────────────┼────────────────────────────────┼────────────────────────────────┤
-        │                                │ short string                   │ hello there how are you doin   │
-        │                                │                                │ g today? I am fine, thank yo   │
-        │                                │                                │ u.                             │
+        │                                │ short string                   │ hello there how are you doing  │
+        │                                │                                │ today? I am fine, thank you.   │
         ╘════════════════════════════════╧════════════════════════════════╧════════════════════════════════╛''')
 
         self.assertEqual(jtbl.cli.make_table(data=stdin, columns=100), (self.SUCCESS, expected))
@@ -494,6 +452,31 @@ class MyTests(unittest.TestCase):
 
         self.assertEqual(jtbl.cli.make_csv_table(data=stdin), (self.SUCCESS, expected))
 
+    def test_write_csv_table(self):
+        """test that csv rows written one at a time include the headers of every row"""
+        stdin = [{"a": 1, "b": "x,y"}, {"c": None, "a": 2.5}, {"b": {"nested": [1, 2]}}]
+        expected = 'a,b,c\r\n1,"x,y",\r\n2.5,,\r\n,"{\'nested\': [1, 2]}",\r\n\n'
+
+        for data in (stdin, iter(stdin)):
+            output = io.StringIO()
+            jtbl.cli.write_csv_table(data=data, output=output)
+            self.assertEqual(output.getvalue(), expected)
+
+    def test_write_csv_table_fields(self):
+        """test that csv rows are written with the given headers"""
+        stdin = [{"a": 1, "b": 2}, {"b": 3}]
+        expected = 'b,a\r\n2,1\r\n3,\r\n\n'
+
+        for data in (stdin, iter(stdin)):
+            output = io.StringIO()
+            jtbl.cli.write_csv_table(data=data, output=output, fields=['b', 'a'])
+            self.assertEqual(output.getvalue(), expected)
+
+    def test_write_csv_table_not_object(self):
+        """test that a stream of non-objects raises an error"""
+        output = io.StringIO()
+        self.assertRaises(jtbl.cli.ParseError, jtbl.cli.write_csv_table, data=iter([{"a": 1}, 2]), output=output, columns=80)
+
 
     def test_html(self):
         """test html output"""
@@ -683,6 +666,235 @@ class MyTests(unittest.TestCase):
 
         self.assertEqual(jtbl.cli.make_rotate_table(data=stdin, columns=self.columns, nowrap=True, rotate=True), (self.SUCCESS, expected))
 
+    def test_iter_rotate_table(self):
+        """test that rotated items are yielded one at a time from an iterator"""
+        stdin = [{"key1": "value1", "key2": 2}, {"key1": "value2"}]
+        expected = [
+            'item: 0\n' + '─' * 20 + '\nkey1  value1\nkey2  2\n',
+            'item: 1\n' + '─' * 20 + '\nkey1  value2\n'
+        ]
+
+        self.assertEqual(list(jtbl.cli.iter_rotate_table(data=iter(stdin), columns=20, rotate=True)), expected)
+        self.assertEqual(jtbl.cli.make_rotate_table(data=stdin, columns=20, rotate=True), (self.SUCCESS, '\n'.join(expected)))
+
+    def test_tabulate_imported_lazily(self):
+        """test that tabulate is not imported when the built-in renderer can draw the table"""
+        check = 'import sys, jtbl.cli; jtbl.cli.make_table(data=[{"a": 1}], columns=80); print("tabulate" in sys.modules)'
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True, cwd=root)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+    def test_profile(self):
+        """test that make_table records the wrap and render stages"""
+        import tracemalloc
+        profile = jtbl.cli.Profile(enabled=True)
+        try:
+            jtbl.cli.make_table(data=[{"a": 1, "b": "x"}, {"a": 2}], columns=80, profile=profile)
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual([stage['stage'] for stage in profile.stages], ['wrap', 'render'])
+        self.assertEqual(profile.stages[1]['renderer'], 'built-in')
+        for stage in profile.stages:
+            self.assertEqual((stage['rows'], stage['columns']), (2, 2))
+            self.assertGreaterEqual(stage['wall_ms'], 0)
+            self.assertIn('cpu_ms', stage)
+            self.assertIn('peak_memory_kb', stage)
+
+    def test_table_from_dicts(self):
+        """test that rows are stored as tuples in header order with None for missing keys"""
+        stdin = [{"key1": "value1", "key2": 1}, {"key3": None, "key1": "value2"}]
+        table = jtbl.cli.Table.from_dicts(stdin)
+
+        self.assertEqual(table.headers, ['key1', 'key2', 'key3'])
+        self.assertEqual(table.index, {'key1': 0, 'key2': 1, 'key3': 2})
+        self.assertEqual(table.rows, [('value1', 1, None), ('value2', None, None)])
+        self.assertFalse(hasattr(table, '__dict__'))
+
+    def test_truncated_headers_keep_columns(self):
+        """test that columns are not merged when their truncated headers are the same"""
+        stdin = [{"answer_num": 1, "answer_len": 2}]
+        expected = textwrap.dedent('''\
+          ans    ans
+        -----  -----
+            1      2''')
+
+        self.assertEqual(jtbl.cli.make_table(data=stdin, columns=10, truncate=True), (self.SUCCESS, expected))
+
+    def test_stream(self):
+        """test that stream output matches the simple table"""
+        stdin = [{"key1": "value1", "key2": None}, {"key1": "value2", "key2": 22, "key3": "x"}]
+        expected = textwrap.dedent('''\
+        key1      key2
+        ------  ------
+        value1
+        value2      22''')
+
+        self.assertEqual('\n'.join(jtbl.cli.make_stream_table(data=iter(stdin), columns=self.columns, sample_rows=1)), expected)
+
+    def test_stream_wrap_after_sample(self):
+        """test that values wider than the sampled width are wrapped or truncated"""
+        stdin = [{"key": "value"}, {"key": "a longer value"}]
+        expected_wrap = textwrap.dedent('''\
+        key
+        -----
+        value
+        a lon
+        ger v
+        alue''')
+        expected_truncate = textwrap.dedent('''\
+        key
+        -----
+        value
+        a lon''')
+
+        self.assertEqual('\n'.join(jtbl.cli.make_stream_table(data=stdin, columns=self.columns, sample_rows=1)), expected_wrap)
+        self.assertEqual('\n'.join(jtbl.cli.make_stream_table(data=stdin, columns=self.columns, truncate=True, sample_rows=1)), expected_truncate)
+
+    def test_stream_not_object(self):
+        """test that a stream of non-objects raises an error"""
+        stdin = ["value1", "value2"]
+        self.assertRaises(jtbl.cli.ParseError, list, jtbl.cli.make_stream_table(data=stdin, columns=self.columns))
+
+    def test_stream_no_keys(self):
+        """test that objects without keys print an empty line like make_table()"""
+        self.assertEqual(list(jtbl.cli.make_stream_table(data=[{}, {}], columns=self.columns)), [''])
+
+    def test_stream_not_object_after_sample(self):
+        """test that a non-object after the sample raises the check_data() error"""
+        stdin = [{"a": 1}, 5]
+        with self.assertRaises(jtbl.cli.ParseError) as cm:
+            list(jtbl.cli.make_stream_table(data=stdin, columns=self.columns, sample_rows=1))
+
+        self.assertIn('Cannot represent this part of the JSON Object as a table', str(cm.exception))
+
+    def test_follow(self):
+        """test that follow output keeps column widths until a new key or wider value arrives"""
+        stdin = [{"a": 1, "b": "x"}, {"a": 22, "b": "y"}, {"a": 3, "b": "longer"}, {"a": 4, "c": True}]
+        expected = textwrap.dedent('''\
+          a  b
+        ---  ---
+          1  x
+         22  y
+
+          a  b
+        ---  ------
+          3  longer
+
+          a  b       c
+        ---  ------  ----
+          4          True''')
+
+        self.assertEqual('\n'.join(jtbl.cli.make_follow_table(data=iter(stdin), columns=self.columns)), expected)
+
+    def test_follow_no_keys(self):
+        """test that follow output starts with the first row that has keys"""
+        stdin = [{}, {"a": 1}, {}]
+        expected = textwrap.dedent('''\
+          a
+        ---
+          1
+        ''')
+
+        self.assertEqual('\n'.join(jtbl.cli.make_follow_table(data=iter(stdin), columns=self.columns)), expected)
+
+    def test_follow_not_object(self):
+        """test that a non-object in follow mode raises an error"""
+        stdin = [{"a": 1}, "value"]
+        self.assertRaises(jtbl.cli.ParseError, list, jtbl.cli.make_follow_table(data=stdin, columns=self.columns))
+
+
+    def test_render_table_matches_tabulate(self):
+        """test that the built-in renderer matches tabulate for mixed column types"""
+        table = jtbl.cli.Table(['int', 'float', 'text', 'flag'], [
+            (1, 1.5, 'a', True),
+            (22, -10.25, 'two words', None),
+            (None, 3.0, '  padded ', False),
+            (1000, None, None, None)
+        ])
+        for table_format in ('simple', 'plain', 'fancy_grid', 'github', 'dokuwiki'):
+            self.assertEqual(
+                jtbl.cli.render_table(table, table_format),
+                jtbl.cli.get_tabulate().tabulate(table.rows, headers=table.headers, tablefmt=table_format, floatfmt='')
+            )
+
+    def test_render_table_fallback(self):
+        """test that formats and values the built-in renderer does not handle fall back to tabulate"""
+        table = jtbl.cli.Table(['key'], [('\x1b[31mred\x1b[0m',)])
+        self.assertIsNone(jtbl.cli.render_table(table, 'simple'))
+        self.assertIsNone(jtbl.cli.render_table(jtbl.cli.Table(['key'], [('value',)]), 'rst'))
+
+    def test_render_table_parallel(self):
+        """test that tables rendered in chunks in a process pool match the serial output"""
+        table = jtbl.cli.Table(['id', 'value', 'text'], [
+            (i, i / 4, 'word\n' * (i % 3)) for i in range(200)
+        ])
+        with unittest.mock.patch.object(jtbl.cli, 'PARALLEL_MIN_ROWS', 30):
+            for table_format in ('simple', 'fancy_grid', 'github'):
+                self.assertEqual(
+                    jtbl.cli.render_table(table, table_format, jobs=2),
+                    jtbl.cli.render_table(table, table_format)
+                )
+
+    def test_row_store_spill(self):
+        """test that rows over the memory budget are written to disk and read back in order"""
+        rows = [{"id": i, "name": "x" * (i % 7), "nested": {"a": [i, None, True]}} for i in range(500)]
+        store = jtbl.cli.RowStore(rows, max_bytes=4096)
+        self.assertTrue(store.spilled)
+        self.assertEqual(len(store), 500)
+        self.assertEqual(list(store), rows)
+        self.assertEqual(list(store), rows)
+        store.close()
+
+    def test_write_table_row_store(self):
+        """test that a table written from a RowStore matches make_table"""
+        rows = [{"id": i, "value": i * 1.5, "text": "word " * (i % 9), "flag": i % 2 == 0} for i in range(300)]
+        for truncate in (False, True):
+            succeeded, expected = jtbl.cli.make_table(data=rows, truncate=truncate, columns=self.columns)
+            output = io.StringIO()
+            jtbl.cli.write_table(
+                data=jtbl.cli.RowStore(rows, max_bytes=4096), output=output, truncate=truncate, columns=self.columns
+            )
+            self.assertEqual(output.getvalue(), expected + '\n')
+
+
+    def test_truncate_keeps_numbers(self):
+        """test that numeric columns keep their width when other columns are truncated"""
+        stdin = [{"n": 1234567.25, "s": "the quick brown fox jumps over the lazy dog"}]
+        expected = textwrap.dedent('''\
+                 n  s
+        ----------  ------------------
+        1234567.25  the quick brown fo''')
+
+        self.assertEqual(jtbl.cli.make_table(data=stdin, columns=30, truncate=True), (self.SUCCESS, expected))
+
+    def test_fit_widths(self):
+        """test capping the widest columns to fit the total width"""
+        self.assertEqual(jtbl.cli.fit_widths([10, 6, 3], 19), [10, 6, 3])
+        self.assertEqual(jtbl.cli.fit_widths([10, 6, 3], 15), [6, 6, 3])
+        self.assertEqual(jtbl.cli.fit_widths([10, 6, 3], 12), [4, 4, 3])
+        self.assertEqual(jtbl.cli.fit_widths([10, 6, 3], 8), [4, 4, 3])
+        self.assertEqual(jtbl.cli.fit_widths([10, 6, 3], 15, min_width=[8, 4, 3]), [8, 4, 3])
+
+    def test_sample(self):
+        """test that values wider than the sampled column widths are wrapped or truncated"""
+        stdin = [{"key": "value", "num": 1}, {"key": "a longer value", "num": 22}]
+        expected_wrap = textwrap.dedent('''\
+        key      num
+        -----  -----
+        value      1
+        a lon     22
+        ger v
+        alue''')
+        expected_truncate = textwrap.dedent('''\
+        key      num
+        -----  -----
+        value      1
+        a lon     22''')
+
+        self.assertEqual(jtbl.cli.make_table(data=stdin, columns=self.columns, sample=1), (self.SUCCESS, expected_wrap))
+        self.assertEqual(jtbl.cli.make_table(data=stdin, columns=self.columns, truncate=True, sample=1), (self.SUCCESS, expected_truncate))
+
 
 if __name__ == '__main__':
     unittest.main()